@@ -1,62 +1,109 @@
 """Configuration and fixture definitions for testing."""
 
+from collections.abc import Iterable
+from copy import deepcopy
 from importlib import resources
+from pathlib import Path
 
 import pytest
 
+from ve_data_science_tool.config import Config
+
+_DUMMY_CONFIG = Config(
+    repository_path=str(resources.files("tests")),
+    app_client_uuid="dummy_value",
+    app_client_name="dummy_value",
+    remote_collection_uuid="dummy_value",
+    local_collection_uuid="dummy_value",
+)
+"""A dummy configuration object pointing to the tests directory."""
+
 
 def record_found_in_log(
     caplog: pytest.LogCaptureFixture,
-    find: tuple[int, str],
+    find: Iterable[tuple[int, str]],
 ) -> bool:
-    """Look for a specific logging record in the captured log.
+    """Look for specific logging records in the captured log.
 
     Arguments:
         caplog: An instance of the caplog fixture
-        find: A tuple giving the logging level and message to look for
+        find: An iterable of tuples giving the logging level and message of each
+            record to look for
 
     """
 
-    try:
-        # Iterate over the record tuples, ignoring the leading element
-        # giving the logger name
-        _ = next(msg for msg in caplog.record_tuples if msg[1:] == find)
-        return True
-    except StopIteration:
-        return False
+    # Reduce the record tuples to a set, ignoring the leading element giving the logger
+    # name, and check all of the records are present
+    return set(find).issubset(msg[1:] for msg in caplog.record_tuples)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def fixture_config():
-    """Create a dummy configuration object."""
-    from ve_data_science_tool.config import Config
+    """Provide the dummy configuration object.
 
-    repo_path = resources.files("tests")
+    This fixture is shared across the test session and is also the value returned by
+    the mocked ``load_config``, so tests that need to alter the configuration should
+    modify a copy of the object.
+    """
+
+    return _DUMMY_CONFIG
+
+
+@pytest.fixture
+def fixture_tmp_config(fixture_config, tmp_path):
+    """Provide a copy of the dummy configuration using a temporary repository path.
+
+    The repository path is set to the ``tmp_path`` directory for the test, so that
+    tests can create repository contents without altering the shared configuration.
+    """
+
+    config = deepcopy(fixture_config)
+    config.repository_path = str(tmp_path)
+
+    return config
 
-    return Config(
-        repository_path=str(repo_path),
-        app_client_uuid="dummy_value",
-        app_client_name="dummy_value",
-        remote_collection_uuid="dummy_value",
-        local_collection_uuid="dummy_value",
-    )
+
+@pytest.fixture(scope="session")
+def fixture_manifest_file_schema():
+    """Provide the shared ManifestFile schema instance."""
+    from ve_data_science_tool.data import _MANIFEST_FILE_SCHEMA
+
+    return _MANIFEST_FILE_SCHEMA
+
+
+@pytest.fixture(scope="session")
+def fixture_data_directory_templates(tmp_path_factory):
+    """Provide session-wide template data directories.
+
+    This returns a function that takes a tuple of file name and file content pairs and
+    returns the path to a template directory containing those files. Each distinct
+    directory content is only written once per test session, so tests should copy the
+    template rather than alter it.
+    """
+
+    templates: dict[tuple[tuple[str, str], ...], Path] = {}
+
+    def _get_template(directory_content: tuple[tuple[str, str], ...]) -> Path:
+        if directory_content not in templates:
+            template = tmp_path_factory.mktemp("template")
+            for file_name, file_contents in directory_content:
+                (template / file_name).write_text(file_contents)
+            templates[directory_content] = template
+
+        return templates[directory_content]
+
+    return _get_template
 
 
 @pytest.fixture(scope="session", autouse=True)
 def fixture_mocked_config(session_mocker):
-    """Mock the load config call for all tests."""
-    from ve_data_science_tool.config import Config
+    """Mock the load config call for all tests.
 
-    repo_path = resources.files("tests")
-
-    mocked_value = Config(
-        repository_path=str(repo_path),
-        app_client_uuid="dummy_value",
-        app_client_name="dummy_value",
-        remote_collection_uuid="dummy_value",
-        local_collection_uuid="dummy_value",
-    )
+    The patch is applied once per test session. When running tests in parallel with
+    ``pytest-xdist``, each worker process runs its own session and so applies its own
+    patch.
+    """
 
     session_mocker.patch(
-        "ve_data_science_tool.config.load_config", return_value=mocked_value
+        "ve_data_science_tool.config.load_config", return_value=_DUMMY_CONFIG
     )
@@ -1,6 +1,7 @@
 """Test the data module."""
 
 import logging
+import shutil
 from contextlib import nullcontext as does_not_raise
 from logging import ERROR, INFO
 from pathlib import Path
@@ -8,6 +9,15 @@ from pathlib import Path
 import pytest
 from marshmallow.exceptions import ValidationError
 
+from ve_data_science_tool.data import (
+    _FormattedMessages,
+    check_data,
+    check_data_directory,
+    load_manifest,
+    populate_manifest,
+    update_manifests,
+)
+
 from .conftest import record_found_in_log
 
 
@@ -26,6 +36,18 @@ from .conftest import record_found_in_log
             None,
             id="good_script",
         ),
+        pytest.param(
+            {"name": "file.txt", "url": "not a url"},
+            pytest.raises(ValidationError),
+            (("url", ["Not a valid URL."]),),
+            id="bad_url",
+        ),
+        pytest.param(
+            {"name": "file.txt", "url": "https://example.org\n"},
+            pytest.raises(ValidationError),
+            (("url", ["Not a valid URL."]),),
+            id="bad_url_trailing_newline",
+        ),
         pytest.param(
             {"naem": "file.txt", "script": "script.py"},
             pytest.raises(ValidationError),
@@ -37,27 +59,33 @@ from .conftest import record_found_in_log
         ),
     ],
 )
-def test_ManifestFile(input, outcome, messages):
+def test_ManifestFile(fixture_manifest_file_schema, input, outcome, messages):
     """Test the ManifestFile dataclass."""
-    from ve_data_science_tool.data import ManifestFile
 
     with outcome as excep:
-        _ = ManifestFile.Schema().load(input)
+        _ = fixture_manifest_file_schema.load(input)
 
     if excep:
         for msg_key, msg_list in messages:
             assert excep.value.messages[msg_key] == msg_list
 
 
-@pytest.mark.parametrize(
-    argnames="directory_path, directory_content, expected_result, expected_log",
-    argvalues=(
-        pytest.param(
-            "data/primary/carbon_use_efficiency",
-            (
-                (
-                    "MANIFEST.yaml",
-                    """directory: data/primary/carbon_use_efficiency
+def test_FormattedMessages():
+    """Test that validation messages are logged as a compact indented pretty print."""
+
+    messages = {
+        "files": {0: {"name": ["Missing data for required field."]}},
+        "naem": ["Unknown field."],
+    }
+
+    assert str(_FormattedMessages(messages, prefix="   ")) == (
+        "   {'files': {0: {'name': ['Missing data for required field.']}},\n"
+        "    'naem': ['Unknown field.']}"
+    )
+
+
+# Manifest file contents used in test_check_data_directory
+_MANIFEST_GOOD = """directory: data/primary/carbon_use_efficiency
 files:
   - name: data_file1.csv
     url: https://example.org
@@ -65,8 +93,59 @@ files:
   - name: data_file2.csv
     url: https://example.org
     md5: e1e72bc35b6a23f3937d507623c1177f
-""",
-                ),
+"""
+
+_MANIFEST_IN_EMPTY_DIRECTORY = "directory: data/primary/carbon_use_efficiency files: []"
+
+_MANIFEST_INVALID_YAML = " - this: is\n   not; valid YAML"
+
+_MANIFEST_DIRECTORY_MISNAMED = """directory_name: data/primary/carbon_use_efficiency
+files:
+  - name: data_file1.csv
+    url: https://example.org
+    md5: e1e72bc35b6a23f3937d507623c1177f
+"""
+
+_MANIFEST_NO_FILES = "directory: data/primary/carbon_use_efficiency"
+
+_MANIFEST_BAD_DIR = """directory: data/primary/soil/carbon_use_efficiency
+files:
+  - name: data_file1.csv
+    url: https://example.org
+    md5: e1e72bc35b6a23f3937d507623c1177f
+"""
+
+_MANIFEST_ABSOLUTE_DIR = """directory: /data/primary/carbon_use_efficiency
+files:
+  - name: data_file1.csv
+    url: https://example.org
+    md5: e1e72bc35b6a23f3937d507623c1177f
+"""
+
+_MANIFEST_FILE_LIST_ISSUES = """directory: data/primary/carbon_use_efficiency
+files:
+  - name: data_file3.csv
+    url: https://example.org
+    md5: e1e72bc35b6a23f3937d507623c1177f
+  - name: data_file2.csv
+    url: https://example.org
+    md5: e1e72bc35b6a23f3937d507623c1177f
+"""
+
+_MANIFEST_NO_URL_OR_SCRIPT = """directory: data/primary/carbon_use_efficiency
+files:
+  - name: data_file3.csv
+    md5: e1e72bc35b6a23f3937d507623c1177f
+"""
+
+
+@pytest.mark.parametrize(
+    argnames="directory_path, directory_content, expected_result, expected_log",
+    argvalues=(
+        pytest.param(
+            "data/primary/carbon_use_efficiency",
+            (
+                ("MANIFEST.yaml", _MANIFEST_GOOD),
                 ("data_file1.csv", ""),
                 ("data_file2.csv", ""),
             ),
@@ -86,12 +165,7 @@ files:
         ),
         pytest.param(
             "data/primary/carbon_use_efficiency",
-            (
-                (
-                    "MANIFEST.yaml",
-                    """directory: data/primary/carbon_use_efficiency files: []""",
-                ),
-            ),
+            (("MANIFEST.yaml", _MANIFEST_IN_EMPTY_DIRECTORY),),
             False,
             ((ERROR, " \u2717 MANIFEST.yaml file in empty directory"),),
             id="manifest in empty directory",
@@ -99,10 +173,7 @@ files:
         pytest.param(
             "data/primary/carbon_use_efficiency",
             (
-                (
-                    "MANIFEST.yaml",
-                    """ - this: is\n   not; valid YAML""",
-                ),
+                ("MANIFEST.yaml", _MANIFEST_INVALID_YAML),
                 ("data_file1.csv", ""),
             ),
             False,
@@ -112,15 +183,7 @@ files:
         pytest.param(
             "data/primary/carbon_use_efficiency",
             (
-                (
-                    "MANIFEST.yaml",
-                    """directory_name: data/primary/carbon_use_efficiency
-files:
-  - name: data_file1.csv
-    url: https://example.org
-    md5: e1e72bc35b6a23f3937d507623c1177f
-""",
-                ),
+                ("MANIFEST.yaml", _MANIFEST_DIRECTORY_MISNAMED),
                 ("data_file1.csv", ""),
             ),
             False,
@@ -130,10 +193,7 @@ files:
         pytest.param(
             "data/primary/carbon_use_efficiency",
             (
-                (
-                    "MANIFEST.yaml",
-                    """directory: data/primary/carbon_use_efficiency""",
-                ),
+                ("MANIFEST.yaml", _MANIFEST_NO_FILES),
                 ("data_file1.csv", ""),
             ),
             False,
@@ -143,21 +203,14 @@ files:
         pytest.param(
             "data/primary/carbon_use_efficiency",
             (
-                (
-                    "MANIFEST.yaml",
-                    """directory: data/primary/soil/carbon_use_efficiency
-files:
-  - name: data_file1.csv
-    url: https://example.org
-    md5: e1e72bc35b6a23f3937d507623c1177f
-                    """,
-                ),
+                ("MANIFEST.yaml", _MANIFEST_BAD_DIR),
                 ("data_file1.csv", ""),
             ),
             False,
             (
                 (
                     ERROR,
+                    " \u2717 Manifest contains errors\n"
                     "   \u2717 MANIFEST.yaml directory does not match location: "
                     "data/primary/soil/carbon_use_efficiency",
                 ),
@@ -166,46 +219,50 @@ files:
         ),
         pytest.param(
             "data/primary/carbon_use_efficiency",
+            (
+                ("MANIFEST.yaml", _MANIFEST_ABSOLUTE_DIR),
+                ("data_file1.csv", ""),
+            ),
+            False,
             (
                 (
-                    "MANIFEST.yaml",
-                    """directory: data/primary/carbon_use_efficiency
-files:
-  - name: data_file3.csv
-    url: https://example.org
-    md5: e1e72bc35b6a23f3937d507623c1177f
-  - name: data_file2.csv
-    url: https://example.org
-    md5: e1e72bc35b6a23f3937d507623c1177f
-""",
+                    ERROR,
+                    " \u2717 Manifest contains errors\n"
+                    "   \u2717 MANIFEST.yaml directory does not match location: "
+                    "/data/primary/carbon_use_efficiency",
                 ),
+            ),
+            id="directory_absolute",
+        ),
+        pytest.param(
+            "data/primary/carbon_use_efficiency",
+            (
+                ("MANIFEST.yaml", _MANIFEST_FILE_LIST_ISSUES),
                 ("data_file1.csv", ""),
                 ("data_file2.csv", ""),
             ),
             False,
             (
-                (ERROR, "   \u2717 Unknown files in manifest: data_file3.csv"),
-                (ERROR, "   \u2717 Files missing from manifest: data_file1.csv"),
+                (
+                    ERROR,
+                    " \u2717 Manifest contains errors\n"
+                    "   \u2717 Unknown files in manifest: data_file3.csv\n"
+                    "   \u2717 Files missing from manifest: data_file1.csv",
+                ),
             ),
             id="file_list_issues",
         ),
         pytest.param(
             "data/primary/carbon_use_efficiency",
             (
-                (
-                    "MANIFEST.yaml",
-                    """directory: data/primary/carbon_use_efficiency
-files:
-  - name: data_file3.csv
-    md5: e1e72bc35b6a23f3937d507623c1177f
-""",
-                ),
+                ("MANIFEST.yaml", _MANIFEST_NO_URL_OR_SCRIPT),
                 ("data_file3.csv", ""),
             ),
             False,
             (
                 (
                     ERROR,
+                    " \u2717 Manifest contains errors\n"
                     "   \u2717 File does not provide _one_ of url or "
                     "script: data_file3.csv",
                 ),
@@ -216,7 +273,8 @@ files:
 )
 def test_check_data_directory(
     caplog,
-    fixture_config,
+    fixture_tmp_config,
+    fixture_data_directory_templates,
     tmp_path,
     directory_path,
     directory_content,
@@ -225,26 +283,177 @@ def test_check_data_directory(
 ):
     """Test the check_data_directory function."""
 
-    from ve_data_science_tool.data import check_data_directory
+    caplog.set_level(logging.INFO)
+
+    # Deploy test payload to a temporary directory from the session template
+    test_dir = tmp_path / Path(directory_path)
+    shutil.copytree(fixture_data_directory_templates(directory_content), test_dir)
+
+    # Test the function
+    result = check_data_directory(config=fixture_tmp_config, directory=test_dir)
+
+    assert result == expected_result
+
+    assert record_found_in_log(caplog, expected_log)
+
+
+def test_check_data(caplog, fixture_tmp_config, tmp_path):
+    """Test the check_data function."""
 
     caplog.set_level(logging.INFO)
 
-    # Deploy test payload to a temporary directory
-    data_relative_path = Path(directory_path)
-    test_dir = tmp_path / data_relative_path
+    # Create a set of nested directories, one of which has a missing manifest, along
+    # with a hidden directory that should not be checked
+    data_dir = tmp_path / "data"
+    for sub_dir in ("a", "a/b", "c", ".hidden"):
+        (data_dir / sub_dir).mkdir(parents=True)
+    (data_dir / "c" / "data_file1.csv").write_text("")
+
+    result = check_data(config=fixture_tmp_config, directory=data_dir)
+
+    assert not result
+
+    # Each directory should be checked once, with the error for a directory logged
+    # immediately after the directory header
+    messages = [msg for _, _, msg in caplog.record_tuples]
+    checked = [msg for msg in messages if msg.startswith("Checking data")]
+    assert sorted(checked) == sorted(
+        f"Checking {Path(sub_dir)}"
+        for sub_dir in ("data", "data/a", "data/a/b", "data/c")
+    )
+    c_index = messages.index(f"Checking {Path('data/c')}")
+    assert messages[c_index + 1] == " \u2717 MANIFEST.yaml not found"
+
+    # A missing directory is reported rather than raising
+    assert not check_data(config=fixture_tmp_config, directory=data_dir / "missing")
+    assert record_found_in_log(caplog, ((ERROR, " \u2717 Directory not found"),))
+
+
+def test_check_data_error(caplog, fixture_tmp_config, tmp_path):
+    """Test that check_data logs the records for a directory that raises an error."""
+
+    caplog.set_level(logging.INFO)
+
+    # A MANIFEST.yaml directory cannot be opened as a manifest file
+    data_dir = tmp_path / "data"
+    (data_dir / "b" / "MANIFEST.yaml").mkdir(parents=True)
+    (data_dir / "b" / "data_file1.csv").write_text("")
+
+    with pytest.raises(OSError):
+        check_data(config=fixture_tmp_config, directory=data_dir)
+
+    # The records for the data directory and the failing directory are still logged
+    messages = [msg for _, _, msg in caplog.record_tuples]
+    assert f"Checking {Path('data')}" in messages
+    assert f"Checking {Path('data/b')}" in messages
+
+
+def test_populate_manifest(fixture_tmp_config, tmp_path):
+    """Test the populate_manifest function creates and updates manifests."""
+
+    test_dir = tmp_path / "data" / "primary"
     test_dir.mkdir(parents=True)
 
-    for file_name, file_contents in directory_content:
-        with open(test_dir / file_name, "w") as test_file:
-            test_file.write(file_contents)
+    # Empty directory - no manifest created
+    status, files = populate_manifest(config=fixture_tmp_config, directory=test_dir)
+    assert status == "empty"
+    assert not files
+    assert not (test_dir / "MANIFEST.yaml").exists()
 
-    # Update the config to point to the temporary directory
-    fixture_config.repository_path = str(tmp_path)
+    # Create a manifest from the directory contents, ignoring hidden files
+    for file_name in ("data_file1.csv", ".hidden"):
+        (test_dir / file_name).write_text("")
 
-    # Test the function
-    result = check_data_directory(config=fixture_config, directory=test_dir)
+    status, files = populate_manifest(config=fixture_tmp_config, directory=test_dir)
+    assert status == "created"
+    assert [f.name for f in files] == ["data_file1.csv"]
 
-    assert result == expected_result
+    manifest = load_manifest(test_dir / "MANIFEST.yaml")
+    assert manifest.directory == "data/primary"
+    assert [f.name for f in manifest.files] == ["data_file1.csv"]
+
+    # Update the manifest with a new file, keeping existing entries
+    (test_dir / "data_file2.csv").write_text("")
+
+    status, files = populate_manifest(config=fixture_tmp_config, directory=test_dir)
+    assert status == "updated"
+    assert [f.name for f in files] == ["data_file2.csv"]
+
+    manifest = load_manifest(test_dir / "MANIFEST.yaml")
+    assert [f.name for f in manifest.files] == ["data_file1.csv", "data_file2.csv"]
+
+    # A further update adds nothing and does not rewrite the manifest
+    manifest_text = (test_dir / "MANIFEST.yaml").read_text() + "# A comment\n"
+    (test_dir / "MANIFEST.yaml").write_text(manifest_text)
+
+    status, files = populate_manifest(config=fixture_tmp_config, directory=test_dir)
+    assert status == "updated"
+    assert not files
+    assert (test_dir / "MANIFEST.yaml").read_text() == manifest_text
+
+
+@pytest.mark.parametrize(
+    argnames="path_type", argvalues=["missing", "file"], ids=["missing", "file"]
+)
+def test_populate_manifest_not_a_directory(fixture_tmp_config, tmp_path, path_type):
+    """Test that populate_manifest reports paths that are not directories as empty."""
+
+    path = tmp_path / "data" / "primary"
+    if path_type == "file":
+        path.parent.mkdir()
+        path.write_text("")
+
+    status, files = populate_manifest(config=fixture_tmp_config, directory=path)
+
+    assert status == "empty"
+    assert not files
+
+
+def test_update_manifests(caplog, fixture_tmp_config, tmp_path):
+    """Test the update_manifests function."""
+
+    caplog.set_level(logging.INFO)
+
+    # Create nested directories with files and an existing invalid manifest
+    data_dir = tmp_path / "data"
+    for sub_dir in ("a", "a/b", "c"):
+        (data_dir / sub_dir).mkdir(parents=True)
+    (data_dir / "a" / "b" / "data_file1.csv").write_text("")
+    (data_dir / "c" / "data_file1.csv").write_text("")
+    (data_dir / "c" / "MANIFEST.yaml").write_text(_MANIFEST_DIRECTORY_MISNAMED)
+
+    result = update_manifests(config=fixture_tmp_config, directory=data_dir)
+
+    assert not result
+    assert (data_dir / "a" / "b" / "MANIFEST.yaml").exists()
+    assert not (data_dir / "a" / "MANIFEST.yaml").exists()
+
+    messages = [msg for _, _, msg in caplog.record_tuples]
+    b_index = messages.index(f"  Directory: {Path('data/a/b')}")
+    assert messages[b_index + 1] == "   \u2713 Manifest created: 1 added"
+    c_index = messages.index(f"  Directory: {Path('data/c')}")
+    assert messages[c_index + 1] == (
+        "   \u2717 Existing manifest contains metadata errors:"
+    )
+
+
+def test_update_manifests_error(caplog, fixture_tmp_config, tmp_path):
+    """Test that update_manifests logs completed directories before an error."""
+
+    caplog.set_level(logging.INFO)
+
+    # Directory b is updated after its parent a, and has a MANIFEST.yaml directory that
+    # cannot be opened as a manifest file
+    data_dir = tmp_path / "data"
+    (data_dir / "a" / "b" / "MANIFEST.yaml").mkdir(parents=True)
+    (data_dir / "a" / "data_file1.csv").write_text("")
+    (data_dir / "a" / "b" / "data_file2.csv").write_text("")
+
+    with pytest.raises(OSError):
+        update_manifests(config=fixture_tmp_config, directory=data_dir)
 
-    for entry in expected_log:
-        assert record_found_in_log(caplog, entry)
+    # The output for the earlier directory and the failing directory is still logged
+    messages = [msg for _, _, msg in caplog.record_tuples]
+    a_index = messages.index(f"  Directory: {Path('data/a')}")
+    assert messages[a_index + 1] == "   \u2713 Manifest created: 1 added"
+    assert f"  Directory: {Path('data/a/b')}" in messages
@@ -0,0 +1,351 @@
+"""Test the globus module.
+
+These tests only cover the parts of the module that do not need a connection to the
+GLOBUS service.
+"""
+
+import os
+import threading
+import time
+from contextlib import nullcontext as does_not_raise
+from logging import ERROR
+from pathlib import Path
+
+import pytest
+
+from ve_data_science_tool.globus import (
+    _ls_filter_function,
+    _recursive_ls_helper,
+    _TokenBucket,
+    get_sync_status,
+    local_ls,
+)
+
+
+@pytest.mark.parametrize(
+    argnames="ls_filter, entry, outcome, expected",
+    argvalues=[
+        pytest.param("", {"name": "a.csv"}, does_not_raise(), True, id="no_filter"),
+        pytest.param(
+            "name:!~.*", {"name": ".hidden"}, does_not_raise(), False, id="hidden"
+        ),
+        pytest.param(
+            "name:!~.*/name:!~MANIFEST.yaml",
+            {"name": "MANIFEST.yaml"},
+            does_not_raise(),
+            False,
+            id="manifest",
+        ),
+        pytest.param(
+            "name:~*.csv,*.txt",
+            {"name": "a.txt"},
+            does_not_raise(),
+            True,
+            id="alternatives",
+        ),
+        pytest.param(
+            "type:=file",
+            {"name": "a", "type": "dir"},
+            does_not_raise(),
+            False,
+            id="type",
+        ),
+        pytest.param(
+            "size:>100",
+            {"name": "a"},
+            pytest.raises(ValueError),
+            None,
+            id="unsupported",
+        ),
+    ],
+)
+def test_ls_filter_function(ls_filter, entry, outcome, expected):
+    """Test the conversion of GLOBUS listing filters to functions."""
+
+    with outcome:
+        matches = _ls_filter_function(ls_filter)
+        assert matches(entry) == expected
+
+
+def test_TokenBucket(mocker):
+    """Test the token bucket rate limiter allows bursts and then waits for tokens."""
+
+    now = mocker.patch("ve_data_science_tool.globus.time.monotonic", return_value=0.0)
+    sleep = mocker.patch("ve_data_science_tool.globus.time.sleep")
+
+    bucket = _TokenBucket(rate=10, capacity=2)
+
+    # The initial burst up to the capacity does not wait
+    bucket.acquire()
+    bucket.acquire()
+    sleep.assert_not_called()
+
+    # With the bucket empty, the next call waits for one token to be added
+    bucket.acquire()
+    sleep.assert_called_once_with(pytest.approx(0.1))
+
+    # After a long pause, the bucket is refilled only up to its capacity
+    sleep.reset_mock()
+    now.return_value = 10.0
+    bucket.acquire()
+    bucket.acquire()
+    sleep.assert_not_called()
+    bucket.acquire()
+    sleep.assert_called_once_with(pytest.approx(0.1))
+
+
+# Canned endpoint directory listings used by the stub transfer client
+_STUB_LISTINGS = {
+    "/data/": [("a", "dir"), ("e", "dir"), ("file1.csv", "file")],
+    "/data/a/": [("b", "dir"), ("file2.csv", "file")],
+    "/data/a/b/": [("c", "dir")],
+    "/data/a/b/c/": [("file3.csv", "file")],
+    "/data/e/": [("file4.csv", "file")],
+}
+
+
+class _StubTransferClient:
+    """A stub transfer client providing canned directory listings.
+
+    The GLOBUS application behind a real transfer client is not thread safe, so the
+    stub fails if a call is made while another call is still running.
+    """
+
+    def __init__(self, listings=_STUB_LISTINGS):
+        self.calls = []
+        self._listings = listings
+        self._in_call = threading.Lock()
+
+    def operation_ls(self, endpoint, path, **params):
+        if not self._in_call.acquire(blocking=False):
+            raise AssertionError("Overlapping calls to the transfer client")
+
+        try:
+            # Hold the call open briefly so that any concurrent calls would overlap
+            time.sleep(0.01)
+            path = path.rstrip("/") + "/"
+            self.calls.append((path, params))
+            return {
+                "path": path,
+                "DATA": [
+                    {
+                        "name": name,
+                        "type": entry_type,
+                        "last_modified": "2024-01-01 00:00:00+00:00",
+                    }
+                    for name, entry_type in self._listings.get(path, [])
+                ],
+            }
+        finally:
+            self._in_call.release()
+
+
+@pytest.mark.parametrize(
+    argnames="max_depth, expected_names, expected_paths",
+    argvalues=[
+        pytest.param(
+            0,
+            ["a", "e", "file1.csv"],
+            ["/data/"],
+            id="depth_0",
+        ),
+        pytest.param(
+            1,
+            ["a", "a/b", "a/file2.csv", "e", "e/file4.csv", "file1.csv"],
+            ["/data/", "/data/a/", "/data/e/"],
+            id="depth_1",
+        ),
+        pytest.param(
+            3,
+            [
+                "a",
+                "a/b",
+                "a/b/c",
+                "a/b/c/file3.csv",
+                "a/file2.csv",
+                "e",
+                "e/file4.csv",
+                "file1.csv",
+            ],
+            ["/data/", "/data/a/", "/data/a/b/", "/data/a/b/c/", "/data/e/"],
+            id="depth_3",
+        ),
+    ],
+)
+def test_recursive_ls_helper(mocker, max_depth, expected_names, expected_paths):
+    """Test the level order recursive listing of an endpoint."""
+
+    transfer_client = _StubTransferClient()
+    rate_limiter = mocker.Mock()
+
+    listing = list(
+        _recursive_ls_helper(
+            transfer_client,
+            "endpoint",
+            [("/data", "", 0)],
+            max_depth,
+            rate_limiter,
+            ls_params={"filter": "name:!~.*"},
+            top_level_ls_params={"show_hidden": False},
+        )
+    )
+
+    # Directories are only listed to the maximum depth, and the names of entries are
+    # prefixed with the path of their directory relative to the top level
+    assert sorted(entry["name"] for entry in listing) == expected_names
+    assert sorted(path for path, _ in transfer_client.calls) == expected_paths
+
+    # The top level parameters are only used for the first call and every call takes a
+    # token from the rate limiter
+    assert dict(transfer_client.calls) == {
+        path: (
+            {"filter": "name:!~.*", "show_hidden": False}
+            if path == "/data/"
+            else {"filter": "name:!~.*"}
+        )
+        for path in expected_paths
+    }
+    assert rate_limiter.acquire.call_count == len(expected_paths)
+
+
+def test_local_ls(fixture_tmp_config, tmp_path):
+    """Test the local_ls function."""
+
+    # Create nested directories with data files, a manifest and hidden files
+    data_dir = tmp_path / "data"
+    for sub_dir in ("a/b/c/d", ".hidden"):
+        (data_dir / sub_dir).mkdir(parents=True)
+    for file_path in ("a/data_file1.csv", "a/MANIFEST.yaml", "a/.hidden", "a/b/c/d/x"):
+        (data_dir / file_path).write_text("")
+    os.utime(data_dir / "a" / "data_file1.csv", (0, 1700000000.5))
+
+    # A broken symlink is skipped rather than raising an error
+    try:
+        os.symlink(data_dir / "a" / "missing.csv", data_dir / "a" / "broken.csv")
+    except OSError:  # pragma: no cover - symlinks may not be permitted on Windows
+        pass
+
+    listing = list(
+        local_ls(config=fixture_tmp_config, ls_filter="name:!~.*/name:!~MANIFEST.yaml")
+    )
+
+    # Entries are listed without the filtered files and to a maximum depth of three
+    # directories
+    assert sorted((entry["name"], entry["type"]) for entry in listing) == [
+        ("a", "dir"),
+        ("a/b", "dir"),
+        ("a/b/c", "dir"),
+        ("a/b/c/d", "dir"),
+        ("a/data_file1.csv", "file"),
+    ]
+
+    # Modification times match the GLOBUS timestamp format
+    last_modified = {entry["name"]: entry["last_modified"] for entry in listing}
+    assert last_modified["a/data_file1.csv"] == "2023-11-14 22:13:20+00:00"
+
+
+def test_local_ls_unreadable_directory(caplog, fixture_tmp_config, tmp_path):
+    """Test that local_ls skips directories that cannot be listed."""
+
+    data_dir = tmp_path / "data"
+    for sub_dir in ("locked", "open"):
+        (data_dir / sub_dir).mkdir(parents=True)
+        (data_dir / sub_dir / "data_file1.csv").write_text("")
+
+    (data_dir / "locked").chmod(0o000)
+    try:
+        if os.access(data_dir / "locked", os.R_OK):
+            pytest.skip("Directory permissions are not enforced for this user")
+
+        listing = list(local_ls(config=fixture_tmp_config))
+    finally:
+        (data_dir / "locked").chmod(0o755)
+
+    # The unreadable directory is listed but its contents are not
+    assert sorted(entry["name"] for entry in listing) == [
+        "locked",
+        "open",
+        "open/data_file1.csv",
+    ]
+    assert any(
+        msg.startswith("Could not list local directory:")
+        for _, level, msg in caplog.record_tuples
+        if level == ERROR
+    )
+
+
+def test_get_sync_status(mocker, fixture_config):
+    """Test the get_sync_status function with fixed endpoint listings."""
+
+    def _listing(*entries):
+        return iter(
+            {"name": name, "type": entry_type, "last_modified": modified}
+            for name, entry_type, modified in entries
+        )
+
+    older = "2024-01-01 00:00:00+00:00"
+    newer = "2024-06-01 00:00:00+00:00"
+
+    mocker.patch(
+        "ve_data_science_tool.globus.globus_ls",
+        return_value=_listing(
+            ("a", "dir", older),
+            ("a/same.csv", "file", older),
+            ("a/remote_only.csv", "file", older),
+            ("a/local_newer.csv", "file", older),
+            ("a/remote_newer.csv", "file", newer),
+        ),
+    )
+    mocker.patch(
+        "ve_data_science_tool.globus.local_ls",
+        return_value=_listing(
+            ("a", "dir", older),
+            ("a/same.csv", "file", older),
+            ("a/local_only.csv", "file", older),
+            ("a/local_newer.csv", "file", newer),
+            ("a/remote_newer.csv", "file", older),
+        ),
+    )
+
+    status = get_sync_status(transfer_client=None, config=fixture_config)
+
+    assert {key: sorted(value) for key, value in status.items()} == {
+        "local_only": ["a/local_only.csv"],
+        "remote_only": ["a/remote_only.csv"],
+        "up_to_date": ["a/same.csv"],
+        "remote_outdated": ["a/local_newer.csv"],
+        "local_outdated": ["a/remote_newer.csv"],
+    }
+
+
+def test_get_sync_status_local_from_globus(fixture_tmp_config):
+    """Test the get_sync_status function with both listings retrieved via GLOBUS.
+
+    The stub transfer client fails if the two listings make overlapping calls.
+    """
+
+    remote_path = "ve_data_science/data/"
+    local_path = str(Path(fixture_tmp_config.repository_path) / "data") + "/"
+    transfer_client = _StubTransferClient(
+        listings={
+            remote_path: [("a.csv", "file")],
+            local_path: [("a.csv", "file"), ("b.csv", "file")],
+        }
+    )
+
+    status = get_sync_status(
+        transfer_client=transfer_client,
+        config=fixture_tmp_config,
+        local_from_globus=True,
+    )
+
+    assert sorted(path for path, _ in transfer_client.calls) == sorted(
+        [remote_path, local_path]
+    )
+    assert status == {
+        "local_only": ["b.csv"],
+        "remote_only": [],
+        "up_to_date": ["a.csv"],
+        "remote_outdated": [],
+        "local_outdated": [],
+    }
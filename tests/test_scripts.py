@@ -1,13 +1,25 @@
 """Test the scripts module."""
 
 from importlib import resources
+from logging import ERROR
+from pathlib import Path
 
 import pytest
 
+from ve_data_science_tool.scripts import (
+    ScriptMetadata,
+    check_scripts,
+    read_markdown_notebook_metadata,
+    read_py_script_metadata,
+    read_r_script_metadata,
+    validate_script_metadata,
+)
+
+from .conftest import record_found_in_log
+
 
 def test_read_r_script_metadata():
     """Test read_r_script_metadata."""
-    from ve_data_science_tool.scripts import read_r_script_metadata
 
     path = resources.files("tests.script_files")
     metadata = read_r_script_metadata(path / "script.R")
@@ -17,7 +29,6 @@ def test_read_r_script_metadata():
 
 def test_read_py_script_metadata():
     """Test read_py_script_metadata."""
-    from ve_data_science_tool.scripts import read_py_script_metadata
 
     path = resources.files("tests.script_files")
     metadata = read_py_script_metadata(path / "script.py")
@@ -28,7 +39,6 @@ def test_read_py_script_metadata():
 @pytest.mark.parametrize(argnames="file_name", argvalues=("script.Rmd", "script.md"))
 def test_read_markdown_notebook_metadata(file_name):
     """Test read_rmd_script_metadata."""
-    from ve_data_science_tool.scripts import read_markdown_notebook_metadata
 
     path = resources.files("tests.script_files")
     metadata = read_markdown_notebook_metadata(path / file_name)
@@ -36,15 +46,68 @@ def test_read_markdown_notebook_metadata(file_name):
     assert isinstance(metadata, dict)
 
 
+@pytest.mark.parametrize(
+    argnames="reader, content, message",
+    argvalues=(
+        pytest.param(
+            read_r_script_metadata,
+            "x <- 1\n#| ---\n#| title: x\n#| ---\n",
+            "First YAML metadata markers is not at the file start.",
+            id="r_not_at_start",
+        ),
+        pytest.param(
+            read_r_script_metadata,
+            "#| ---\n#| title: x\nx <- 1\n",
+            "YAML block not contained within document markers.",
+            id="r_unclosed",
+        ),
+        pytest.param(
+            read_r_script_metadata,
+            "#| ---\n#| title: x\nx <- 1\n#| ---\n",
+            "Inconsistent use of YAML line comment within YAML block.",
+            id="r_inconsistent",
+        ),
+        pytest.param(
+            read_markdown_notebook_metadata,
+            "# Title\n---\nve_data_science:\n---\n",
+            "First YAML metadata markers is not at the file start.",
+            id="md_not_at_start",
+        ),
+        pytest.param(
+            read_markdown_notebook_metadata,
+            "---\nve_data_science:\n  title: x\n",
+            "Found 1 not 2 YAML metadata markers.",
+            id="md_unclosed",
+        ),
+        pytest.param(
+            read_py_script_metadata,
+            "# A comment\nimport os\n",
+            "Missing docstring in python script",
+            id="py_no_docstring",
+        ),
+        pytest.param(
+            read_py_script_metadata,
+            '"""---\ntitle: x\n',
+            "Could not read docstring in python script",
+            id="py_unterminated",
+        ),
+    ),
+)
+def test_read_metadata_errors(tmp_path, reader, content, message):
+    """Test the errors raised for badly placed YAML metadata markers."""
+
+    file_path = tmp_path / "script"
+    file_path.write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        reader(file_path)
+
+
 @pytest.mark.parametrize(
     argnames="filename", argvalues=("script.R", "script.py", "script.Rmd", "script.md")
 )
 def test_validate_script_metadata(filename):
     """Test the validation function."""
-    from ve_data_science_tool.scripts import (
-        ScriptMetadata,
-        validate_script_metadata,
-    )
 
     path = resources.files("tests.script_files")
     metadata = validate_script_metadata(path / filename)
@@ -52,11 +115,55 @@ def test_validate_script_metadata(filename):
     assert isinstance(metadata, ScriptMetadata)
 
 
-def test_check_scripts(fixture_config):
+def test_validate_script_metadata_unsupported(tmp_path):
+    """Test that validation rejects unsupported file types."""
+
+    file_path = tmp_path / "script.txt"
+    file_path.write_text("")
+
+    with pytest.raises(ValueError, match=r"Unsupported script file type: \.txt"):
+        validate_script_metadata(file_path)
+
+
+@pytest.mark.parametrize(
+    argnames="min_parallel_files", argvalues=(32, 1), ids=("serial", "parallel")
+)
+def test_check_scripts(mocker, fixture_config, min_parallel_files):
     """Test the validation function."""
-    from ve_data_science_tool.scripts import check_scripts
+
+    mocker.patch(
+        "ve_data_science_tool.scripts._PARALLEL_VALIDATION_MIN_FILES",
+        min_parallel_files,
+    )
 
     path = resources.files("tests.script_files")
     success = check_scripts(config=fixture_config, directory=path)
 
     assert success
+
+
+def test_check_scripts_skips_hidden(fixture_tmp_config, tmp_path):
+    """Test that check_scripts skips hidden files and directories."""
+
+    path = resources.files("tests.script_files")
+    (tmp_path / "analysis" / ".hidden").mkdir(parents=True)
+    (tmp_path / "analysis" / "script.py").write_text((path / "script.py").read_text())
+    for bad_file in (".hidden.R", ".hidden/bad.R"):
+        (tmp_path / "analysis" / bad_file).write_text("x <- 1\n")
+
+    assert check_scripts(config=fixture_tmp_config, check_file_locations=False)
+
+
+def test_check_scripts_missing_io_file(caplog, fixture_tmp_config, tmp_path):
+    """Test that check_scripts reports missing input and output files."""
+
+    path = resources.files("tests.script_files")
+    script = (path / "script.R").read_text()
+    (tmp_path / "script.R").write_text(script.replace("referenced_file", "missing"))
+
+    assert not check_scripts(config=fixture_tmp_config, directory=tmp_path)
+
+    missing = Path("tests/script_files/missing.csv")
+    assert record_found_in_log(
+        caplog, ((ERROR, f"       \u2717 File not found: {missing}"),)
+    )
@@ -0,0 +1,31 @@
+"""Test the utils module."""
+
+from pathlib import Path
+
+import pytest
+
+from ve_data_science_tool.utils import relative_path_function
+
+
+@pytest.mark.parametrize(
+    argnames="path, expected",
+    argvalues=[
+        pytest.param("", Path("."), id="root"),
+        pytest.param("data", Path("data"), id="directory"),
+        pytest.param("data/primary/file.csv", Path("data/primary/file.csv"), id="file"),
+        pytest.param(None, None, id="outside"),
+    ],
+)
+def test_relative_path_function(fixture_tmp_config, tmp_path, path, expected):
+    """Test the function to get paths relative to the repository root."""
+
+    relative_path = relative_path_function(fixture_tmp_config)
+
+    # A sibling of the repository root with the root name as a prefix is outside
+    full_path = (
+        tmp_path.with_name(tmp_path.name + "_other")
+        if path is None
+        else tmp_path / path
+    )
+
+    assert relative_path(full_path) == expected
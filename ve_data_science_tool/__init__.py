@@ -13,3 +13,15 @@ LOGGER = logging.getLogger("ve_data_science")
 # handler = logging.StreamHandler()
 # handler.name = "sdv_stream_log"
 # LOGGER.addHandler(handler)
+
+# Use the LibYAML bindings for YAML loading and dumping where they are available,
+# falling back to the pure Python implementations.
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper, SafeLoader  # type: ignore[assignment] # noqa: F401
+
+    LOGGER.warning(
+        "LibYAML bindings not available: using slower pure Python YAML processing."
+    )
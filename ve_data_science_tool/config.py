@@ -1,15 +1,17 @@
 """Tools to create and load the tool configuration."""
 
+from functools import lru_cache
 from pathlib import Path
 from typing import ClassVar
 
-import globus_sdk
 import platformdirs
 import yaml
 from marshmallow import Schema
 from marshmallow.exceptions import ValidationError
 from marshmallow_dataclass import dataclass
 
+from ve_data_science_tool import SafeDumper, SafeLoader
+
 
 @dataclass
 class Config:
@@ -32,6 +34,10 @@ class Config:
     Schema: ClassVar[type[Schema]]
 
 
+_CONFIG_SCHEMA = Config.Schema()
+"""A shared schema instance for loading and dumping Config data."""
+
+
 def configure(
     client_uuid: str, remote_uuid: str, repository_dir: str | None = None
 ) -> Path:
@@ -70,8 +76,12 @@ def configure(
             "root or provide path."
         )
 
-    # Retrieve the local collection UUID using the globus_sdk and set it
+    # Retrieve the local collection UUID using the globus_sdk and set it. The SDK is
+    # imported here as it is slow to import and is not otherwise needed to load the
+    # configuration.
     # TODO - likely needs more error trapping
+    import globus_sdk
+
     local = globus_sdk.LocalGlobusConnectPersonal()
     if local is None:
         raise RuntimeError("Could not connect to Globus Connect Personal.")
@@ -94,18 +104,25 @@ def configure(
         config_directory.mkdir(parents=True)
 
     with open(config_file, "w") as cfg_out:
-        yaml.safe_dump(
-            data=Config.Schema().dump(config),
+        yaml.dump(
+            data=_CONFIG_SCHEMA.dump(config),
             stream=cfg_out,
+            Dumper=SafeDumper,
         )
 
+    # Discard any previously loaded configuration
+    load_config.cache_clear()
+
     return config_file
 
 
+@lru_cache(maxsize=1)
 def load_config() -> Config:
     """Load the configuration file.
 
-    This method loads the configuration file and returns a Config instance.
+    This method loads the configuration file and returns a Config instance. The loaded
+    configuration is cached, so repeated calls return the same instance: use
+    ``load_config.cache_clear()`` to force the file to be read again.
 
     """
 
@@ -117,12 +134,12 @@ def load_config() -> Config:
 
     with open(config_file) as cfp:
         try:
-            config_data = yaml.safe_load(cfp)
+            config_data = yaml.load(cfp, Loader=SafeLoader)
         except yaml.YAMLError as excep:
             raise ValueError("Error reading configuration YAML: " + str(excep))
 
     try:
-        config: Config = Config.Schema().load(data=config_data)
+        config: Config = _CONFIG_SCHEMA.load(data=config_data)
     except ValidationError as excep:
         raise ValueError("Invalid configuration data: " + str(excep))
 
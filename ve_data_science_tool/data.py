@@ -1,18 +1,31 @@
 """Module to maintain data directories."""
 
+import logging
+import os
+import re
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import field
+from functools import cached_property
 from pathlib import Path
 from pprint import pformat
 from textwrap import indent
-from typing import ClassVar, Literal
+from typing import Any, ClassVar, Literal, NamedTuple, TypeVar
 
 import yaml
-from marshmallow import Schema
+from marshmallow import Schema, validate
 from marshmallow.exceptions import ValidationError
 from marshmallow_dataclass import dataclass
-from marshmallow_dataclass.typing import Url
 
-from ve_data_science_tool import LOGGER
+from ve_data_science_tool import LOGGER, SafeDumper, SafeLoader
 from ve_data_science_tool.config import Config
+from ve_data_science_tool.utils import relative_path_function
+
+_T = TypeVar("_T")
+
+_URL_REGEX = re.compile(r"\A(https?|ftps?)://\S+\Z", re.IGNORECASE)
+"""A compiled regular expression used to validate manifest file URLs."""
 
 
 @dataclass
@@ -20,10 +33,16 @@ class ManifestFile:
     """A dataclass for file details in data directory manifests."""
 
     name: str
-    url: Url | None = None
+    url: str | None = field(
+        default=None,
+        metadata={"validate": validate.Regexp(_URL_REGEX, error="Not a valid URL.")},
+    )
     script: str | None = None
     md5: str | None = None
 
+    # Type the Schema attribute
+    Schema: ClassVar[type[Schema]]
+
 
 @dataclass
 class Manifest:
@@ -35,6 +54,92 @@ class Manifest:
     # Type the Schema attribute
     Schema: ClassVar[type[Schema]]
 
+    @cached_property
+    def file_names(self) -> frozenset[str]:
+        """The set of file names in the manifest.
+
+        This is calculated once on first access and is not updated if the ``files``
+        attribute is subsequently altered.
+        """
+        return frozenset(entry.name for entry in self.files)
+
+
+_MANIFEST_SCHEMA = Manifest.Schema()
+"""A shared schema instance for loading and dumping Manifest data."""
+
+_MANIFEST_FILE_SCHEMA = ManifestFile.Schema()
+"""A shared schema instance for loading and dumping ManifestFile data."""
+
+
+class _ThreadLogBuffer(logging.Filter):
+    """Hold back log records emitted within worker threads.
+
+    When added as a filter to a logger, records logged from within a call to
+    :meth:`capture` are stored rather than handled. The stored records are returned
+    alongside the outcome of the call and can then be handled in order using
+    :meth:`emit`. Records logged in any other context are passed through as normal.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._local = threading.local()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Store the record if logged within a call to capture."""
+        records = getattr(self._local, "records", None)
+        if records is None:
+            return True
+
+        records.append(record)
+        return False
+
+    def capture(
+        self, func: Callable[..., _T], *args: Any, **kwargs: Any
+    ) -> tuple[Future[_T], list[logging.LogRecord]]:
+        """Call a function, returning the outcome and any records logged by the call.
+
+        The outcome is returned as a completed future holding either the result of the
+        call or the exception it raised. This keeps the records logged before an
+        exception, so that they can be handled before the exception is re-raised by
+        retrieving the result.
+        """
+        outcome: Future[_T] = Future()
+        self._local.records = []
+        try:
+            outcome.set_result(func(*args, **kwargs))
+        except Exception as excep:
+            outcome.set_exception(excep)
+        finally:
+            records = self._local.records
+            self._local.records = None
+
+        return outcome, records
+
+    def emit(self, records: list[logging.LogRecord]) -> None:
+        """Handle a list of previously captured records."""
+        for record in records:
+            LOGGER.handle(record)
+
+
+class _FormattedMessages:
+    """Lazily format validation error messages for logging.
+
+    Formatting is deferred until the logging record is actually emitted, when the
+    messages are rendered using a compact pretty print with each line starting with a
+    prefix.
+
+    Args:
+        messages: The messages from a marshmallow ValidationError.
+        prefix: A string added to the start of each line.
+    """
+
+    def __init__(self, messages: dict | list | str, prefix: str = "") -> None:
+        self.messages = messages
+        self.prefix = prefix
+
+    def __str__(self) -> str:
+        return indent(pformat(self.messages, indent=1, compact=True), self.prefix)
+
 
 def load_manifest(file: Path) -> Manifest:
     """Load a manifest file.
@@ -49,19 +154,151 @@ def load_manifest(file: Path) -> Manifest:
 
     with open(file) as manifest_io:
         try:
-            manifest_data: dict = yaml.safe_load(manifest_io)
+            manifest_data: dict = yaml.load(manifest_io, Loader=SafeLoader)
         except yaml.error.YAMLError:
             raise
 
     # Does it conform to the Schema
     try:
-        manifest = Manifest.Schema().load(data=manifest_data)
+        manifest = _MANIFEST_SCHEMA.load(data=manifest_data)
     except ValidationError:
         raise
 
     return manifest
 
 
+class _DirectoryContents(NamedTuple):
+    """The contents of a data directory, as found by :func:`_scan_directory`."""
+
+    files: frozenset[str]
+    """The names of the non-hidden files in the directory, excluding MANIFEST.yaml."""
+    has_manifest: bool
+    """Does the directory contain a MANIFEST.yaml file."""
+    subdirectories: list[Path]
+    """The paths of the non-hidden subdirectories of the directory."""
+
+
+def _scan_directory(directory: Path) -> _DirectoryContents:
+    """Scan the contents of a data directory.
+
+    This uses a single ``os.scandir`` pass over the directory, which provides the file
+    type of each entry without an additional ``stat`` call. Symbolic links to
+    directories are not included in the subdirectories.
+
+    Args:
+        directory: The directory to scan.
+
+    Raises:
+        OSError: If the directory cannot be scanned.
+    """
+
+    files = set()
+    has_manifest = False
+    subdirectories = []
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name == "MANIFEST.yaml":
+                has_manifest = True
+            elif entry.name.startswith("."):
+                continue
+            elif entry.is_dir(follow_symlinks=False):
+                subdirectories.append(Path(entry.path))
+            elif entry.is_file():
+                files.add(entry.name)
+
+    return _DirectoryContents(
+        files=frozenset(files),
+        has_manifest=has_manifest,
+        subdirectories=subdirectories,
+    )
+
+
+def _scandir_dirs(root: Path) -> Iterator[tuple[Path, _DirectoryContents | None]]:
+    """Recursively yield a directory and its subdirectories.
+
+    The directory tree is walked lazily, scanning each directory once using
+    :func:`_scan_directory`, and each directory is yielded along with those scanned
+    contents. The root directory is yielded first and each directory is yielded before
+    its own subdirectories. Hidden directories are skipped and symbolic links to
+    directories are not followed.
+
+    Args:
+        root: The directory to walk.
+    """
+
+    # Paths that are missing, not directories or not readable are yielded without
+    # contents: any problem with the path itself is reported when it is processed.
+    try:
+        contents = _scan_directory(root)
+    except OSError:
+        yield root, None
+        return
+
+    yield root, contents
+
+    for subdirectory in contents.subdirectories:
+        yield from _scandir_dirs(subdirectory)
+
+
+def _map_directories(
+    func: Callable[..., _T],
+    config: Config,
+    directories: Iterable[tuple[Path, _DirectoryContents | None]],
+) -> list[_T]:
+    """Apply a function to a set of directories concurrently.
+
+    The function is called as ``func(config, directory, directory_relative=...,
+    directory_contents=...)`` for each directory and its scanned contents, as yielded by
+    :func:`_scandir_dirs`, using a thread pool. The directories are expected to be
+    resolved paths, so the path of each directory relative to the repository is
+    calculated without resolving it again: this is None for directories outside the
+    repository.
+
+    The log records from each call are held back and then emitted in directory order,
+    so that the log output for each directory is kept together. The results are
+    returned in the same order as the directories. If a call raises an exception, the
+    records for that directory and for all earlier directories are emitted before the
+    exception is re-raised.
+
+    Args:
+        func: The function to apply to each directory.
+        config: A config object
+        directories: The resolved paths of the directories to process, along with
+            their contents.
+    """
+
+    log_buffer = _ThreadLogBuffer()
+
+    relative_path = relative_path_function(config)
+
+    def _process(
+        directory_and_contents: tuple[Path, _DirectoryContents | None],
+    ) -> tuple[Future[_T], list[logging.LogRecord]]:
+        directory, directory_contents = directory_and_contents
+
+        return log_buffer.capture(
+            func,
+            config,
+            directory,
+            directory_relative=relative_path(directory),
+            directory_contents=directory_contents,
+        )
+
+    LOGGER.addFilter(log_buffer)
+    results = []
+
+    try:
+        with ThreadPoolExecutor() as executor:
+            for outcome, records in executor.map(_process, directories):
+                log_buffer.emit(records)
+                results.append(outcome.result())
+    finally:
+        LOGGER.removeFilter(log_buffer)
+
+    return results
+
+
 def check_data_directory(config: Config, directory: Path) -> bool:
     """Validate a data directory.
 
@@ -77,10 +314,37 @@ def check_data_directory(config: Config, directory: Path) -> bool:
         directory: A path to a data directory.
     """
 
+    return _check_data_directory(
+        config=config,
+        directory=directory,
+        directory_relative=relative_path_function(config)(directory.resolve()),
+        directory_contents=None,
+    )
+
+
+def _check_data_directory(
+    config: Config,
+    directory: Path,
+    directory_relative: Path | None,
+    directory_contents: _DirectoryContents | None,
+) -> bool:
+    """Validate a data directory using a known relative path and contents.
+
+    This implements :func:`check_data_directory`, and is also called by
+    :func:`check_data` with the relative path and contents found while walking the
+    directory tree.
+
+    Args:
+        config: A Config object.
+        directory: A path to a data directory.
+        directory_relative: The path of the directory relative to the repository
+            root, or None if the directory is not within the repository.
+        directory_contents: The scanned contents of the directory, or None if the
+            directory has not been scanned.
+    """
+
     # Check that the directory a subpath within the repository
-    try:
-        directory_relative = directory.resolve().relative_to(config.repository_path)
-    except ValueError:
+    if directory_relative is None:
         LOGGER.error(
             f" \u2717 The directory is not within the "
             f"ve_data_science repo: {directory!s}"
@@ -89,35 +353,35 @@ def check_data_directory(config: Config, directory: Path) -> bool:
 
     LOGGER.info(f"Checking {directory_relative}")
 
-    # Do we have a directory to validate
-    if not directory.exists():
-        LOGGER.error(" \u2717 Directory not found")
-        return False
+    # Scan the directory contents if they have not already been provided
+    if directory_contents is None:
+        # Do we have a directory to validate
+        if not directory.exists():
+            LOGGER.error(" \u2717 Directory not found")
+            return False
 
-    if not directory.is_dir():
-        LOGGER.error(" \u2717 Directory path is a file not a directory")
-        return False
+        if not directory.is_dir():
+            LOGGER.error(" \u2717 Directory path is a file not a directory")
+            return False
 
-    # Get the directory file as a set
-    actual_files = {
-        f.name
-        for f in directory.iterdir()
-        if not f.name.startswith(".") and f.is_file() and f.name != "MANIFEST.yaml"
-    }
+        directory_contents = _scan_directory(directory)
+
+    actual_files = directory_contents.files
+    manifest_found = directory_contents.has_manifest
 
     # Check the MANIFEST.yaml file is present if files are present and that no MANIFEST
     # is found if there are no files
     manifest_file = directory / "MANIFEST.yaml"
 
-    if actual_files and not manifest_file.exists():
+    if actual_files and not manifest_found:
         LOGGER.error(" \u2717 MANIFEST.yaml not found")
         return False
 
-    if not actual_files and manifest_file.exists():
+    if not actual_files and manifest_found:
         LOGGER.error(" \u2717 MANIFEST.yaml file in empty directory")
         return False
 
-    if not actual_files and not manifest_file.exists():
+    if not actual_files and not manifest_found:
         LOGGER.error(" \u2713 Directory empty: no manifest required.")
         return True
 
@@ -130,7 +394,7 @@ def check_data_directory(config: Config, directory: Path) -> bool:
         return False
     except ValidationError as excep:
         LOGGER.error(" \u2717 MANIFEST.yaml structure incorrect:")
-        LOGGER.error(indent(pformat(excep.messages, indent=1, compact=True), "   "))
+        LOGGER.error("%s", _FormattedMessages(excep.messages, prefix="   "))
         return False
 
     # Are the contents valid and complete.
@@ -139,18 +403,24 @@ def check_data_directory(config: Config, directory: Path) -> bool:
     logged_errors = []
 
     # Is the relative directory path in the manifest file congruent with its location?
-    if directory_relative != Path(manifest.directory):
+    # Manifest directories use forward slashes, so compare the path parts directly
+    # without constructing a Path from the manifest entry. Empty and "." parts are
+    # dropped, as they would be by Path, but an absolute path never matches.
+    manifest_parts = tuple(
+        part for part in manifest.directory.split("/") if part not in ("", ".")
+    )
+    if manifest.directory.startswith("/") or directory_relative.parts != manifest_parts:
         logged_errors.append(
             f"   \u2717 MANIFEST.yaml directory does not match "
             f"location: {manifest.directory}"
         )
         return_value = False
 
-    manifest_files = {entry.name for entry in manifest.files}
+    manifest_files = manifest.file_names
 
-    if not manifest_files == actual_files:
-        only_in_manifest = manifest_files.difference(actual_files)
-        only_in_directory = actual_files.difference(manifest_files)
+    if manifest_files != actual_files:
+        only_in_manifest = manifest_files - actual_files
+        only_in_directory = actual_files - manifest_files
 
         if only_in_manifest:
             logged_errors.append(
@@ -178,9 +448,8 @@ def check_data_directory(config: Config, directory: Path) -> bool:
     if return_value is True:
         LOGGER.info(" \u2713 Valid manifest")
     else:
-        LOGGER.error(" \u2717 Manifest contains errors")
-        for msg in logged_errors:
-            LOGGER.error(msg)
+        # Report the errors as a single multiline message
+        LOGGER.error("\n".join([" \u2717 Manifest contains errors", *logged_errors]))
 
     return return_value
 
@@ -204,14 +473,14 @@ def check_data(config: Config, directory: Path | None = None) -> bool:
 
     LOGGER.info(f"Checking all data directories within : {directory}")
 
-    # Walk the directories. Future note pathlib.Path.walk() in 3.12+
-    directories = [path for path in directory.rglob("*") if path.is_dir()]
-    directories.insert(0, directory)
+    # Walk the directories from the resolved root, passing them to the thread pool as
+    # they are found
+    directories = _scandir_dirs(directory.resolve())
 
-    for each_dir in directories:
-        check_data_directory(config=config, directory=each_dir)
+    # Validate the directories concurrently
+    results = _map_directories(_check_data_directory, config, directories)
 
-    return True
+    return all(results)
 
 
 def populate_manifest(
@@ -244,24 +513,48 @@ def populate_manifest(
     """
 
     # Check that the directory a subpath within the repository
-    try:
-        directory_relative = directory.resolve().relative_to(config.repository_path)
-    except ValueError:
+    directory_relative = relative_path_function(config)(directory.resolve())
+    if directory_relative is None:
         raise ValueError(
             f"The directory is not within the ve_data_science repo: {directory!s}"
         )
 
+    # A path that is missing or is not a directory contains no files
+    if not directory.is_dir():
+        return "empty", []
+
+    return _populate_manifest(
+        directory=directory,
+        directory_relative=directory_relative,
+        directory_contents=_scan_directory(directory),
+    )
+
+
+def _populate_manifest(
+    directory: Path,
+    directory_relative: Path,
+    directory_contents: _DirectoryContents,
+) -> tuple[Literal["empty", "created", "updated"], list[Path]]:
+    """Populate a manifest file using a known relative path and directory contents.
+
+    This implements :func:`populate_manifest`, and is also used when updating
+    manifests with the relative path and contents found while walking the directory
+    tree.
+
+    Args:
+        directory: The directory containing the manifest.
+        directory_relative: The path of the directory relative to the repository root.
+        directory_contents: The scanned contents of the directory.
+    """
+
     # Get the expected manifest file path and the non-hidden files within the directory
     # that are not the MANIFEST file itself (if one exists) paths in the directory
     manifest_path = directory / "MANIFEST.yaml"
     # TODO - filter to data files?
-    files = [
-        f
-        for f in directory.glob("*")
-        if not (f.is_dir() or f.name.startswith(".") or f.name == "MANIFEST.yaml")
-    ]
+    files = [directory / name for name in sorted(directory_contents.files)]
+    manifest_exists = directory_contents.has_manifest
 
-    if not (manifest_path).exists():
+    if not manifest_exists:
         # Do not create manifest files in empty directories
         if not files:
             return "empty", files
@@ -270,12 +563,14 @@ def populate_manifest(
         # within the directory. This does not attempt to populate the url or script
         # attribute.
         manifest = Manifest(
-            directory=str(directory_relative),
+            directory=directory_relative.as_posix(),
             files=[ManifestFile(name=f.name) for f in files],
         )
 
         with open(manifest_path, "w") as outfile:
-            yaml.safe_dump(data=Manifest.Schema().dump(manifest), stream=outfile)
+            yaml.dump(
+                data=_MANIFEST_SCHEMA.dump(manifest), stream=outfile, Dumper=SafeDumper
+            )
 
         return "created", files
 
@@ -285,15 +580,21 @@ def populate_manifest(
     except (yaml.error.YAMLError, ValidationError):
         raise
 
-    existing_files = set([f.name for f in manifest.files])
-    new_files = [f for f in files if f.name not in existing_files]
+    new_files = [f for f in files if f.name not in manifest.file_names]
+
+    # Leave the existing manifest untouched if there are no new files to add
+    if not new_files:
+        return "updated", new_files
+
     for file in new_files:
         manifest.files.append(ManifestFile(name=file.name))
 
     with open(manifest_path, "w") as outfile:
-        yaml.safe_dump(data=Manifest.Schema().dump(manifest), stream=outfile)
+        yaml.dump(
+            data=_MANIFEST_SCHEMA.dump(manifest), stream=outfile, Dumper=SafeDumper
+        )
 
-    return "updated", list(new_files)
+    return "updated", new_files
 
 
 def update_manifests(config: Config, directory: Path | None = None) -> bool:
@@ -301,7 +602,9 @@ def update_manifests(config: Config, directory: Path | None = None) -> bool:
 
     This function iterates recursively within a target directory, updating manifest
     files. If no manifest file is found, one is created. Otherwise, files in each
-    directory are added to the existing manifest file.
+    directory are added to the existing manifest file. Directories are updated
+    concurrently. The function logs the process and returns True or False to indicate
+    whether all of the manifests could be updated.
 
     Args:
         config: A config object
@@ -315,34 +618,72 @@ def update_manifests(config: Config, directory: Path | None = None) -> bool:
 
     LOGGER.info(f"Checking all data directories within : {directory}")
 
-    # Walk the directories. Future note pathlib.Path.walk() in 3.12+
-    directories = [path for path in directory.rglob("*") if path.is_dir()]
-    directories.insert(0, directory)
+    # Walk the directories from the resolved root, passing them to the thread pool as
+    # they are found
+    directories = _scandir_dirs(directory.resolve())
 
-    for each_dir in directories:
-        directory_relative = each_dir.resolve().relative_to(config.repository_path)
-        LOGGER.info(f"  Directory: {directory_relative}")
+    # Update the directories concurrently
+    results = _map_directories(_update_directory_manifest, config, directories)
+
+    return all(results)
+
+
+def _update_directory_manifest(
+    config: Config,
+    directory: Path,
+    directory_relative: Path | None,
+    directory_contents: _DirectoryContents | None,
+) -> bool:
+    """Update the manifest file in a single data directory.
+
+    This function populates the manifest for a directory and logs the outcome. It
+    returns True or False to indicate whether the manifest could be updated.
+
+    Args:
+        config: A config object
+        directory: The data directory containing the manifest to update.
+        directory_relative: The path of the directory relative to the repository
+            root, or None if the directory is not within the repository.
+        directory_contents: The scanned contents of the directory, or None if the
+            directory could not be scanned.
+    """
+
+    if directory_relative is None:
+        LOGGER.error(
+            f"   \u2717 The directory is not within the "
+            f"ve_data_science repo: {directory!s}"
+        )
+        return False
+
+    LOGGER.info(f"  Directory: {directory_relative}")
+
+    if directory_contents is None:
+        LOGGER.error("   \u2717 Directory not found")
+        return False
+
+    try:
+        status, files = _populate_manifest(
+            directory=directory,
+            directory_relative=directory_relative,
+            directory_contents=directory_contents,
+        )
+    except yaml.error.YAMLError as excep:
+        LOGGER.error(f"   \u2717 Existing manifest not valid YAML: {excep!s}")
+        return False
+    except ValidationError as excep:
+        LOGGER.error("   \u2717 Existing manifest contains metadata errors:")
+        LOGGER.error("%s", _FormattedMessages(excep.messages, prefix=" " * 5))
+        return False
+
+    match status:
+        case "empty":
+            LOGGER.info("   \u2713 Empty directory")
+        case "created":
+            LOGGER.info(f"   \u2713 Manifest created: {len(files)} added")
+        case "updated":
+            if files:
+                LOGGER.info(f"   \u2713 Manifest updated: {len(files)} added")
+            else:
+                LOGGER.info("   \u2713 Manifest up to date")
 
-        try:
-            status, files = populate_manifest(config=config, directory=each_dir)
-        except yaml.error.YAMLError as excep:
-            LOGGER.error(f"   \u2717 Existing manifest not valid YAML: {excep!s}")
-            continue
-        except ValidationError as excep:
-            LOGGER.error("   \u2717 Existing manifest contains metadata errors:")
-            LOGGER.error(
-                indent(pformat(excep.messages, indent=1, compact=True), " " * 5)
-            )
-            continue
-
-        match status:
-            case "empty":
-                LOGGER.info("   \u2713 Empty directory")
-            case "created":
-                LOGGER.info(f"   \u2713 Manifest created: {len(files)} added")
-            case "updated":
-                if files:
-                    LOGGER.info(f"   \u2713 Manifest updated: {len(files)} added")
-                else:
-                    LOGGER.info("   \u2713 Manifest up to date")
     return True
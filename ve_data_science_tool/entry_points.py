@@ -7,9 +7,6 @@ from pathlib import Path
 
 from ve_data_science_tool import LOGGER
 from ve_data_science_tool.config import configure, load_config
-from ve_data_science_tool.data import check_data, update_manifests
-from ve_data_science_tool.globus import globus_status, globus_sync
-from ve_data_science_tool.scripts import check_scripts
 
 
 def ve_data_science_tool_cli(args_list: list[str] | None = None) -> int:
@@ -140,20 +137,32 @@ def ve_data_science_tool_cli(args_list: list[str] | None = None) -> int:
         LOGGER.error(f"Could not load configuration\n{excep!s}")
         return 0
 
+    # The subcommand implementations are imported as needed, so that each subcommand
+    # only pays the import cost of its own dependencies, notably the GLOBUS SDK.
     match args.subcommand:
         case "scripts":
+            from ve_data_science_tool.scripts import check_scripts
+
             check_scripts(
                 config=config,
                 directory=args.directory,
                 check_file_locations=args.check_file_locations,
             )
         case "manifests":
+            from ve_data_science_tool.data import update_manifests
+
             update_manifests(config=config, directory=args.directory)
         case "data":
+            from ve_data_science_tool.data import check_data
+
             check_data(config=config, directory=args.directory)
         case "globus_sync":
+            from ve_data_science_tool.globus import globus_sync
+
             globus_sync(config=config)
         case "globus_status":
+            from ve_data_science_tool.globus import globus_status
+
             globus_status(config=config)
 
     return 1
@@ -8,10 +8,16 @@ The listing code comes from
 https://globus-sdk-python.readthedocs.io/en/stable/examples/recursive_ls.html
 """
 
+import os
+import re
+import threading
 import time
-from collections import deque
-from collections.abc import Generator
-from datetime import datetime
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Literal
 
@@ -29,22 +35,45 @@ def get_authenticated_transfer_client(config: Config) -> globus_sdk.TransferClie
     support by the GLOBUS development team to interact with the web authorisation
     process for GLOBUS against the Imperial College London high assurance endpoints.
 
+    The authenticated client is cached for each combination of application and remote
+    collection, so repeated calls within a process reuse the client rather than
+    repeating the authorisation checks. The login tokens themselves are persisted
+    between processes by the default token storage of the GLOBUS user application.
+
     Args:
         config: A SyncConfig instance providing connection data.
 
     """
 
-    # Create a user application
-    user_app = globus_sdk.UserApp(
-        app_name=config.app_client_name, client_id=config.app_client_uuid
+    return _get_authenticated_transfer_client(
+        app_client_name=config.app_client_name,
+        app_client_uuid=config.app_client_uuid,
+        remote_collection_uuid=config.remote_collection_uuid,
     )
 
+
+@lru_cache(maxsize=4)
+def _get_authenticated_transfer_client(
+    app_client_name: str, app_client_uuid: str, remote_collection_uuid: str
+) -> globus_sdk.TransferClient:
+    """Create and authorise a GLOBUS Transfer client.
+
+    Args:
+        app_client_name: The name of the GLOBUS user application.
+        app_client_uuid: The client UUID of the GLOBUS user application.
+        remote_collection_uuid: The UUID of the remote collection used to check the
+            client authorisation.
+    """
+
+    # Create a user application
+    user_app = globus_sdk.UserApp(app_name=app_client_name, client_id=app_client_uuid)
+
     # Use that to create a GLOBUS transfer client
     client = globus_sdk.TransferClient(app=user_app)
 
     # Try to run an operation on the client and then handle authorisation errors
     try:
-        _ = client.operation_ls(config.remote_collection_uuid)
+        _ = client.operation_ls(remote_collection_uuid)
 
     except globus_sdk.TransferAPIError as err:
         # Look for the specific case of additional authorisation parameters required in
@@ -67,16 +96,16 @@ def get_authenticated_transfer_client(config: Config) -> globus_sdk.TransferClie
             # application
             user_app.login(auth_params=params)
 
+            # The client should now be authorized
+            try:
+                _ = client.operation_ls(remote_collection_uuid)
+            except Exception:
+                raise RuntimeError("Could not connect to GLOBUS transfer")
+
         # otherwise, there are no authorization parameters, so reraise the error
         else:
             raise
 
-    # The client should now be authorized
-    try:
-        _ = client.operation_ls(config.remote_collection_uuid)
-    except Exception:
-        raise RuntimeError("Could not connect to GLOBUS transfer")
-
     return client
 
 
@@ -136,13 +165,25 @@ def globus_transfer(
         submit_result = transfer_client.submit_transfer(tdata)
         task_id = submit_result["task_id"]
         running = True
-        interval = 2
         start_time = time.time()
         n_files_transferred = -1
         queue_message_emitted = False
 
+        # Poll the task status with an exponential backoff between polls, returning
+        # to the minimum interval whenever the task makes progress.
+        min_interval = 0.25
+        max_interval = 5.0
+        interval = min_interval
+
+        # Only request the task document fields used to monitor progress
+        task_query_params = {
+            "fields": "status,nice_status,is_ok,files,files_transferred"
+        }
+
         while running:
-            task_info = transfer_client.get_task(task_id)
+            task_info = transfer_client.get_task(
+                task_id, query_params=task_query_params
+            )
             runtime = f"[{(time.time() - start_time):6.1f} s]"
 
             # Handle errors
@@ -167,13 +208,15 @@ def globus_transfer(
                 # Total number of files - this is static once populated but is only
                 # populated during the queuing process
                 n_files = task_info["files"]
-                # Report when the number of files transferred increases
+                # Report when the number of files transferred increases, which also
+                # covers the transition from queued to active.
                 if n_files_transferred < task_info["files_transferred"]:
                     n_files_transferred = task_info["files_transferred"]
                     LOGGER.info(
                         f"{runtime} Globus sync active: "
                         f"{n_files_transferred}/{n_files} files transferred"
                     )
+                    interval = min_interval
 
             if task_info["status"] == "SUCCEEDED":
                 LOGGER.info(f"{runtime} Globus sync complete.")
@@ -181,17 +224,19 @@ def globus_transfer(
                 continue
 
             time.sleep(interval)
+            interval = min(interval * 2, max_interval)
 
     except globus_sdk.services.transfer.errors.TransferAPIError as excep:
         raise RuntimeError(f"GLOBUS transfer API error: {excep.raw_json}")
 
-    # Report files
+    # Report files, logging each page of results as it is retrieved
     # https://docs.globus.org/api/transfer/task/#get_task_successful_transfers
-    transferred = transfer_client.task_successful_transfers(task_id)
-
-    if transferred["DATA"]:
-        LOGGER.info("Files transferred")
-        for data in sorted(transferred["DATA"]):
+    header_emitted = False
+    for page in transfer_client.paginated.task_successful_transfers(task_id):
+        for data in sorted(page["DATA"], key=itemgetter("source_path")):
+            if not header_emitted:
+                LOGGER.info("Files transferred")
+                header_emitted = True
             LOGGER.info(f" - {data['source_path']}")
 
     return True
@@ -237,46 +282,89 @@ def globus_sync(config: Config) -> bool:
     return True
 
 
+class _TokenBucket:
+    """A thread safe token bucket rate limiter.
+
+    Tokens are added to the bucket at a fixed rate, up to a maximum capacity, and each
+    call to :meth:`acquire` consumes one token. When the bucket is empty, callers block
+    until their token becomes available. This allows short bursts of calls up to the
+    capacity of the bucket while keeping the average call rate below the fill rate.
+
+    Args:
+        rate: The number of tokens added to the bucket per second.
+        capacity: The maximum number of tokens held by the bucket.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a token from the bucket, waiting until one is available."""
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+
+            # Take the token even if it has not yet been generated, so that concurrent
+            # callers queue up behind each other, and then wait for it to arrive.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+
+
 def _recursive_ls_helper(
     transfer_client: globus_sdk.TransferClient,
     endpoint: str,
-    queue: deque,
+    level: list[tuple[str, str, int]],
     max_depth: int,
-    sleep_frequency: int,
-    sleep_duration: float,
+    rate_limiter: _TokenBucket,
     ls_params: dict = {},
     top_level_ls_params: dict = {},
 ) -> Generator:
-    """Helper function for recursive listing of GLOBUS endpoint."""
+    """Helper function for recursive listing of GLOBUS endpoint.
 
-    call_count = 0
-    while queue:
-        abs_path, rel_path, depth = queue.pop()
-        path_prefix = rel_path + "/" if rel_path else ""
+    The listing is breadth first: all of the directories at one depth are listed
+    before moving on to the next depth, and the results for each level are yielded in
+    the order of the directories in that level. The requests are made one at a time,
+    because the GLOBUS application used to authorise the transfer client is not thread
+    safe, and are paced by the rate limiter.
+    """
 
-        use_params = ls_params
-        if call_count == 0:
-            use_params = {**ls_params, **top_level_ls_params}
+    params = {**ls_params, **top_level_ls_params}
 
-        res = transfer_client.operation_ls(endpoint, path=abs_path, **use_params)
+    while level:
+        next_level: list[tuple[str, str, int]] = []
+        for abs_path, rel_path, depth in level:
+            rate_limiter.acquire()
+            res = transfer_client.operation_ls(endpoint, path=abs_path, **params)
+            params = ls_params
 
-        call_count += 1
-        if call_count % sleep_frequency == 0:
-            time.sleep(sleep_duration)
+            path_prefix = rel_path + "/" if rel_path else ""
 
-        if depth < max_depth:
-            queue.extend(
-                (
-                    res["path"] + item["name"],
-                    path_prefix + item["name"],
-                    depth + 1,
+            if depth < max_depth:
+                next_level.extend(
+                    (
+                        res["path"] + item["name"],
+                        path_prefix + item["name"],
+                        depth + 1,
+                    )
+                    for item in res["DATA"]
+                    if item["type"] == "dir"
                 )
-                for item in res["DATA"]
-                if item["type"] == "dir"
-            )
-        for item in res["DATA"]:
-            item["name"] = path_prefix + item["name"]
-            yield item
+            for item in res["DATA"]:
+                item["name"] = path_prefix + item["name"]
+                yield item
+
+        level = next_level
 
 
 def recursive_ls(
@@ -284,23 +372,28 @@ def recursive_ls(
     endpoint: str,
     path: str,
     max_depth: int = 3,
-    sleep_frequency: int = 10,
-    sleep_duration: float = 0.5,
+    max_requests_per_second: float = 10.0,
+    max_request_burst: int = 10,
     ls_params: dict | None = None,
     top_level_ls_params: dict | None = None,
 ) -> Generator:
-    """A function generating a recursive listing of files on an endpoint."""
+    """A function generating a recursive listing of files on an endpoint.
+
+    Directories are listed level by level. Requests are paced by a token bucket,
+    allowing bursts of up to ``max_request_burst`` requests while keeping the average
+    rate below ``max_requests_per_second``. The defaults are deliberately conservative:
+    the earlier scheme of pausing for half a second after every ten requests allowed
+    bursts of ten requests and at most twenty requests per second, and the default
+    sustained rate is half of that ceiling.
+    """
     ls_params = ls_params or {}
     top_level_ls_params = top_level_ls_params or {}
-    queue: deque = deque()
-    queue.append((path, "", 0))
     yield from _recursive_ls_helper(
         transfer_client,
         endpoint,
-        queue,
+        [(path, "", 0)],
         max_depth,
-        sleep_frequency,
-        sleep_duration,
+        _TokenBucket(rate=max_requests_per_second, capacity=max_request_burst),
         ls_params,
         top_level_ls_params,
     )
@@ -311,13 +404,17 @@ def globus_ls(
     config: Config,
     remote: bool = True,
     ls_filter: str = "",
-) -> list[dict]:
+) -> Iterator[dict]:
     """Retrieve a file listing of a GLOBUS collection.
 
+    The listing is returned as an iterator over the file and directory entries, which
+    are retrieved from the collection as the iterator is consumed.
+
     Note that if this function is used to retrieve the file listing of a local
     collection, then the GLOBUS servers are remotely querying the local endpoint and
     passing the data back in. This is useful for identifying what the GLOBUS system sees
-    on an endpoint, but is not an efficient way to get a local file listing.
+    on an endpoint, but is not an efficient way to get a local file listing: see
+    :func:`local_ls`.
 
     Args:
         transfer_client: An authenticated GLOBUS transfer client.
@@ -344,16 +441,149 @@ def globus_ls(
         ls_params={"filter": ls_filter},
     )
 
-    # Retrieve the data by consuming from the generator
-    file_list = list(file_list_generator)
+    return file_list_generator
+
 
-    return file_list
+def _ls_filter_function(ls_filter: str) -> Callable[[dict], bool]:
+    """Convert a GLOBUS listing filter string into a function matching listing entries.
+
+    This supports the subset of the GLOBUS filter syntax needed to reproduce listing
+    filters on the local file system: filters on the ``name`` and ``type`` fields using
+    the ``=``, ``!=``, ``~`` and ``!~`` operators, with comma separated alternative
+    values and multiple filters separated by ``/``.
+
+    Args:
+        ls_filter: A GLOBUS listing filter string.
+
+    Raises:
+        ValueError: if the filter string uses unsupported fields or operators.
+    """
+
+    filters: list[tuple[str, str, list[str]]] = []
+    for filter_string in ls_filter.split("/"):
+        if not filter_string:
+            continue
+
+        field_name, _, condition = filter_string.partition(":")
+        match = re.fullmatch(r"(!?[=~])(.*)", condition)
+        if field_name not in ("name", "type") or match is None:
+            raise ValueError(f"Unsupported GLOBUS listing filter: {filter_string}")
+
+        operator, values = match.groups()
+        filters.append((field_name, operator, values.split(",")))
+
+    def _matches(entry: dict) -> bool:
+        for field_name, operator, values in filters:
+            if operator.endswith("~"):
+                found = any(fnmatchcase(entry[field_name], value) for value in values)
+            else:
+                found = entry[field_name] in values
+
+            if found == operator.startswith("!"):
+                return False
+
+        return True
+
+    return _matches
+
+
+def local_ls(config: Config, ls_filter: str = "", max_depth: int = 3) -> Iterator[dict]:
+    """Retrieve a file listing of the local data directory from the file system.
+
+    This provides the same information as using :func:`globus_ls` on the local
+    collection, but reads the listing directly from the local file system rather than
+    having the GLOBUS servers query the local endpoint. The entries provide the
+    ``name``, ``type`` and ``last_modified`` fields, with names relative to the data
+    directory and modification times formatted as by GLOBUS. As with
+    :func:`recursive_ls`, the listing is breadth first and descends at most
+    ``max_depth`` directories and filtered directories are not descended into.
+    Symbolic links are followed, and entries that cannot be read, such as broken
+    symbolic links, are omitted. Directories that cannot be listed are logged as errors
+    and their contents are omitted.
+
+    Args:
+        config: A config object.
+        ls_filter: GLOBUS filters to apply to the listing
+        max_depth: The maximum directory depth to list.
+    """
+
+    LOGGER.info("Starting file system list on local data directory.")
+    matches = _ls_filter_function(ls_filter)
+
+    level = [(Path(config.repository_path) / "data", "", 0)]
+    while level:
+        next_level: list[tuple[Path, str, int]] = []
+        for abs_path, rel_path, depth in level:
+            path_prefix = rel_path + "/" if rel_path else ""
+
+            # Skip directories that cannot be listed, such as unreadable directories
+            # or directories removed since their parent was listed
+            try:
+                dir_entries = os.scandir(abs_path)
+            except OSError as excep:
+                LOGGER.error(f"Could not list local directory: {excep!s}")
+                continue
+
+            with dir_entries:
+                for dir_entry in dir_entries:
+                    # Apply the filters before looking up the modification time, so
+                    # that filtered entries are not stat'ed
+                    item = {
+                        "name": dir_entry.name,
+                        "type": "dir" if dir_entry.is_dir() else "file",
+                    }
+                    if not matches(item):
+                        continue
+
+                    # Skip entries that cannot be stat'ed, such as broken symlinks
+                    try:
+                        modification_time = dir_entry.stat().st_mtime
+                    except OSError:
+                        continue
+
+                    item["last_modified"] = datetime.fromtimestamp(
+                        int(modification_time), tz=timezone.utc
+                    ).isoformat(sep=" ")
+
+                    if item["type"] == "dir" and depth < max_depth:
+                        next_level.append(
+                            (
+                                abs_path / dir_entry.name,
+                                path_prefix + dir_entry.name,
+                                depth + 1,
+                            )
+                        )
+
+                    item["name"] = path_prefix + dir_entry.name
+                    yield item
+
+        level = next_level
+
+
+def _file_modification_times(file_list: Iterable[dict]) -> dict[str, str]:
+    """Reduce a GLOBUS file listing to file paths and modification dates.
+
+    The file paths are kept as the POSIX path strings provided by GLOBUS, which are
+    cheaper to hash and compare than Path objects. Directory entries are dropped. We
+    can't filter the `TransferClient.operation_ls` using the type:'file' filter string
+    because then the dir entries aren't followed in the recursive search.
+
+    The modification dates are kept as the timestamp strings provided by GLOBUS. These
+    use a fixed width ISO 8601 format in UTC, so they sort in time order and can be
+    compared directly without parsing.
+
+    Args:
+        file_list: An iterable of entries from a GLOBUS file listing.
+    """
+
+    return {f["name"]: f["last_modified"] for f in file_list if f["type"] == "file"}
 
 
 def get_sync_status(
     transfer_client: globus_sdk.TransferClient,
     config: Config,
     ls_filter: str = "name:!~.*/name:!~MANIFEST.yaml",
+    local_from_globus: bool = False,
 ) -> dict[str, list[str]]:
     """Generate a report on the synchronization of the remote and local endpoints.
 
@@ -367,66 +597,82 @@ def get_sync_status(
     * ``remote_outdated``:  present on both but the local file is newer
     * ``local_outdated``: present on both but the remote file is newer
 
+    The lists of file paths are not sorted.
+
     The status check explicitly ignores hidden files and MANIFEST.yaml files. For
     details of the filter string syntax, see:
     https://docs.globus.org/api/transfer/file_operations/#dir_listing_filtering
 
+    By default, the local files are listed directly from the file system using
+    :func:`local_ls`, which only supports a subset of the filter syntax. The local
+    listing can instead be retrieved through GLOBUS to check what the GLOBUS system sees
+    on the local endpoint.
+
     Args:
         transfer_client: An authenticated GLOBUS transfer client.
         config: A config object.
         ls_filter: Filters to pass on to the listing process. The default is to ignore
             hidden files and MANIFEST.yaml files.
+        local_from_globus: Retrieve the local file listing through GLOBUS rather than
+            from the local file system.
     """
 
-    # Get the file listings for each endpoint
-    remote = globus_ls(
-        transfer_client=transfer_client, config=config, ls_filter=ls_filter
-    )
-    local = globus_ls(
+    remote_listing = globus_ls(
         transfer_client=transfer_client,
         config=config,
-        remote=False,
+        remote=True,
         ls_filter=ls_filter,
     )
 
-    # Reduce to simple dictionaries of filename and modification date, dropping
-    # directory entries. We can't filter the `TransferClient.operation_ls` using
-    # the type:'file' filter string because then the dir entries aren't followed in the
-    # recursive search.
-    remote_names = {
-        Path(f["name"]): datetime.fromisoformat(f["last_modified"])
-        for f in local
-        if f["type"] == "file"
-    }
-
-    local_names = {
-        Path(f["name"]): datetime.fromisoformat(f["last_modified"])
-        for f in remote
-        if f["type"] == "file"
-    }
-
-    # Identify paths on both or only one endpoint
-    both_endpoints = set(remote_names).intersection(local_names)
-    local_only = set(remote_names).difference(local_names)
-    remote_only = set(local_names).difference(remote_names)
-
-    # Split files on both endpoints into outdated and up to date
-    both_endpoints_times = {}
-    for file in both_endpoints:
-        both_endpoints_times[file] = (remote_names[file], local_names[file])
-
-    up_to_date = [str(f) for f, (rd, ld) in both_endpoints_times.items() if rd == ld]
-    remote_outdated = [
-        str(f) for f, (rd, ld) in both_endpoints_times.items() if rd < ld
-    ]
-    local_outdated = [str(f) for f, (rd, ld) in both_endpoints_times.items() if rd > ld]
+    # Reduce the file listings for each endpoint to dictionaries of file path and
+    # modification date. The GLOBUS application behind the transfer client is not
+    # thread safe, so a local listing retrieved through GLOBUS is consumed after the
+    # remote listing. Otherwise, the remote listing is consumed in a worker thread
+    # while the local file system is listed.
+    if local_from_globus:
+        remote_names = _file_modification_times(remote_listing)
+        local_names = _file_modification_times(
+            globus_ls(
+                transfer_client=transfer_client,
+                config=config,
+                remote=False,
+                ls_filter=ls_filter,
+            )
+        )
+    else:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            remote_future = executor.submit(_file_modification_times, remote_listing)
+            local_names = _file_modification_times(
+                local_ls(config=config, ls_filter=ls_filter)
+            )
+            remote_names = remote_future.result()
+
+    # Identify paths on only one endpoint
+    remote_paths = remote_names.keys()
+    local_paths = local_names.keys()
+    local_only = local_paths - remote_paths
+    remote_only = remote_paths - local_paths
+
+    # Split files on both endpoints into outdated and up to date in a single pass
+    up_to_date: list[str] = []
+    remote_outdated: list[str] = []
+    local_outdated: list[str] = []
+    for file in remote_paths & local_paths:
+        remote_time = remote_names[file]
+        local_time = local_names[file]
+        if remote_time == local_time:
+            up_to_date.append(file)
+        elif remote_time < local_time:
+            remote_outdated.append(file)
+        else:
+            local_outdated.append(file)
 
     return dict(
-        local_only=sorted([str(file) for file in local_only]),
-        remote_only=sorted([str(file) for file in remote_only]),
-        up_to_date=sorted(up_to_date),
-        remote_outdated=sorted(remote_outdated),
-        local_outdated=sorted(local_outdated),
+        local_only=list(local_only),
+        remote_only=list(remote_only),
+        up_to_date=up_to_date,
+        remote_outdated=remote_outdated,
+        local_outdated=local_outdated,
     )
 
 
@@ -454,7 +700,7 @@ def globus_status(config: Config) -> None:
     for msg, key in output_sections:
         LOGGER.info(msg)
         if status[key]:
-            for file in status[key]:
+            for file in sorted(status[key]):
                 LOGGER.info(f" - {file}")
         else:
             LOGGER.info(" - No files")
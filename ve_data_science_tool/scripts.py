@@ -1,24 +1,44 @@
 """Module to maintain scripts in the analysis directories."""
 
 import ast
+import os
 import re
+import tokenize
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import field
+from functools import partial
 from pathlib import Path
 from pprint import pformat
 from textwrap import indent
-from typing import ClassVar
+from typing import ClassVar, NamedTuple
 
 import yaml
 from marshmallow import Schema, ValidationError
 from marshmallow_dataclass import dataclass
 from yaml.error import YAMLError
 
-from ve_data_science_tool import LOGGER
+from ve_data_science_tool import LOGGER, SafeLoader
 from ve_data_science_tool.config import Config
+from ve_data_science_tool.utils import relative_path_function
 
 SCRIPT_FILES = (".r", ".py", ".md", ".rmd")
 """Suffixes of script files types handled by the scripts module."""
 
+_PY_TRAILING_MARKER_REGEX = re.compile(r"[\n-]+$")
+"""A compiled regular expression matching a trailing YAML document marker."""
+
+_DEFAULT_IGNORE_FILES = frozenset(("__init__.py", "README.md"))
+"""Script file names that are not validated by default."""
+
+_PY_SKIPPED_TOKENS = frozenset(
+    (tokenize.ENCODING, tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE)
+)
+"""Python token types that can precede a module docstring."""
+
+_PARALLEL_VALIDATION_MIN_FILES = 32
+"""The number of script files above which validation uses worker processes."""
+
 
 @dataclass
 class ScriptFileDetails:
@@ -47,6 +67,10 @@ class ScriptMetadata:
     Schema: ClassVar[type[Schema]]
 
 
+_SCRIPT_METADATA_SCHEMA = ScriptMetadata.Schema()
+"""A shared schema instance used to load script metadata."""
+
+
 def validate_script_metadata(file_path: Path) -> ScriptMetadata:
     """Validate VE data science script and notebook metadata.
 
@@ -70,15 +94,10 @@ def validate_script_metadata(file_path: Path) -> ScriptMetadata:
     if not file_path.exists():
         raise ValueError("File path not found.")
 
-    match file_path.suffix.lower():
-        case ".rmd":
-            loader = read_markdown_notebook_metadata
-        case ".r":
-            loader = read_r_script_metadata
-        case ".py":
-            loader = read_py_script_metadata
-        case ".md":
-            loader = read_markdown_notebook_metadata
+    try:
+        loader = _METADATA_READERS[file_path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported script file type: {file_path.suffix}")
 
     try:
         yaml_content = loader(file_path=file_path)
@@ -93,7 +112,7 @@ def validate_script_metadata(file_path: Path) -> ScriptMetadata:
             yaml_content[allowed_empty] = []
 
     try:
-        metadata = ScriptMetadata.Schema().load(yaml_content)
+        metadata = _SCRIPT_METADATA_SCHEMA.load(yaml_content)
     except ValidationError:
         raise
 
@@ -117,44 +136,34 @@ def read_r_script_metadata(file_path: Path) -> dict:
 
     """
 
-    # Load the file contents
-    with open(file_path) as file:
-        content = file.readlines()
-
     yaml_document_marker = "#| ---\n"
 
-    # Locate the YAML document blocks
-    document_markers = [
-        idx for idx, val in enumerate(content) if val == yaml_document_marker
-    ]
-
-    n_doc_markers = len(document_markers)
-
-    # Do we have at least two markers?
-    if n_doc_markers < 2:
-        raise ValueError("YAML block not contained within document markers.")
-
-    # And that the first one is at the start of the file
-    if document_markers[0] != 0:
-        raise ValueError("First YAML metadata markers is not at the file start.")
+    # Read the YAML block from the start of the file, stopping at the closing document
+    # marker. This intentionally omits the trailing document marker, which technically
+    # indicates the start of a second document.
+    with open(file_path) as file:
+        if file.readline() != yaml_document_marker:
+            raise ValueError("First YAML metadata markers is not at the file start.")
 
-    # Extract the block. This intentionally omits the trailing document marker, which
-    # technically indicates the start of a second document.
-    yaml_lines = content[document_markers[0] : document_markers[1]]
+        yaml_lines = [yaml_document_marker]
+        for line in file:
+            if line == yaml_document_marker:
+                break
+            yaml_lines.append(line)
+        else:
+            raise ValueError("YAML block not contained within document markers.")
 
     # Check for consistent YAML marker use
     marked_correctly = [line.startswith("#| ") or line == "#|\n" for line in yaml_lines]
     if not all(marked_correctly):
         raise ValueError("Inconsistent use of YAML line comment within YAML block.")
 
-    # Strip the comment line markers and compile into a YAML document - need to escape
-    # pipe character in regex as it is used as a conditional
-    comment_re = re.compile("^#\\| ?")
-    yaml_lines = [comment_re.sub("", line) for line in yaml_lines]
-    yaml_document = "".join(yaml_lines)
+    # Strip the comment line markers and compile into a YAML document. The check above
+    # ensures every line starts with "#| " or is an empty "#|" comment line.
+    yaml_document = "".join(line[3:] if line != "#|\n" else "\n" for line in yaml_lines)
 
     try:
-        yaml_contents = yaml.safe_load(yaml_document)
+        yaml_contents = yaml.load(yaml_document, Loader=SafeLoader)
     except YAMLError:
         raise
 
@@ -164,29 +173,37 @@ def read_r_script_metadata(file_path: Path) -> dict:
 def read_py_script_metadata(file_path: Path) -> dict:
     """Read metadata from a Python file.
 
-    The metadata should be provided within the body of the file docstring. It is parsed
-    using the ast module.
+    The metadata should be provided within the body of the file docstring. This is read
+    from the first token of the file using the tokenize module, so the rest of the file
+    is not read or parsed.
 
     Args:
         file_path: The path of the python code file
 
     """
 
-    # Get the AST representation of the file and extract the docstring
-    with open(file_path) as file:
-        file_ast = ast.parse(file.read())
-        contents = ast.get_docstring(file_ast, clean=False)
+    # Find the first token after any comments and blank lines, which is the docstring
+    # if it is a string literal
+    with tokenize.open(file_path) as file:
+        try:
+            for token in tokenize.generate_tokens(file.readline):
+                if token.type not in _PY_SKIPPED_TOKENS:
+                    break
+        except (tokenize.TokenError, SyntaxError):
+            raise ValueError("Could not read docstring in python script")
 
-    if contents is None:
+    contents = ast.literal_eval(token.string) if token.type == tokenize.STRING else None
+
+    if not isinstance(contents, str):
         raise ValueError("Missing docstring in python script")
 
     # Strip the trailing document marker, which technically indicates the start of a
     # second YAML document
-    contents = re.sub("[\n-]+$", "\n", contents)
+    contents = _PY_TRAILING_MARKER_REGEX.sub("\n", contents)
 
     # Try and parse the YAML document
     try:
-        yaml_contents = yaml.safe_load(contents)
+        yaml_contents = yaml.load(contents, Loader=SafeLoader)
     except YAMLError:
         raise
 
@@ -206,27 +223,23 @@ def read_markdown_notebook_metadata(file_path: Path) -> dict:
 
     """
 
-    # Load the file contents
+    # Read the YAML block from the start of the file, stopping at the closing document
+    # marker
     with open(file_path) as file:
-        content = file.readlines()
-
-    # Locate the YAML document blocks
-    document_markers = [idx for idx, val in enumerate(content) if val.startswith("---")]
-    n_doc_markers = len(document_markers)
-
-    # Check there are two...
-    if n_doc_markers != 2:
-        raise ValueError(f"Found {n_doc_markers} not 2 YAML metadata markers.")
-
-    # And that the first one is at the start of the file
-    if document_markers[0] != 0:
-        raise ValueError("First YAML metadata markers is not at the file start.")
-
-    # Extract the block
-    yaml_block = content[document_markers[0] : document_markers[1]]
+        first_line = file.readline()
+        if not first_line.startswith("---"):
+            raise ValueError("First YAML metadata markers is not at the file start.")
+
+        yaml_block = [first_line]
+        for line in file:
+            if line.startswith("---"):
+                break
+            yaml_block.append(line)
+        else:
+            raise ValueError("Found 1 not 2 YAML metadata markers.")
 
     try:
-        yaml_contents = yaml.safe_load("".join(yaml_block))
+        yaml_contents = yaml.load("".join(yaml_block), Loader=SafeLoader)
     except YAMLError:
         raise
 
@@ -237,11 +250,121 @@ def read_markdown_notebook_metadata(file_path: Path) -> dict:
     return yaml_contents["ve_data_science"]
 
 
+_METADATA_READERS: dict[str, Callable[..., dict]] = {
+    ".r": read_r_script_metadata,
+    ".py": read_py_script_metadata,
+    ".md": read_markdown_notebook_metadata,
+    ".rmd": read_markdown_notebook_metadata,
+}
+"""Metadata reader functions for each supported script file suffix."""
+
+
+def _iter_script_files(directory: Path, ignore_files: frozenset[str]) -> Iterator[Path]:
+    """Find the script files within a directory and its subdirectories.
+
+    Hidden files are skipped and hidden directories are not searched. File names are
+    checked for script file suffixes before any Path objects are created.
+
+    Args:
+        directory: The directory to search.
+        ignore_files: File names that should not be returned.
+    """
+
+    for root, dirs, files in os.walk(directory):
+        # Prune hidden directories in place so that os.walk does not descend into them
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+
+        for name in files:
+            if (
+                not name.startswith(".")
+                and name.lower().endswith(SCRIPT_FILES)
+                and name not in ignore_files
+            ):
+                yield Path(root) / name
+
+
+def _path_exists(path: Path, directory_entries: dict[Path, frozenset[str]]) -> bool:
+    """Check if a path exists using cached directory listings.
+
+    The entry names in the parent directory of the path are listed once using
+    ``os.scandir`` and stored in ``directory_entries``, so that checking many files in
+    the same directory does not need a separate file system call for each file. Note
+    that names are matched case sensitively, even on case insensitive file systems.
+
+    Args:
+        path: The path to check.
+        directory_entries: A dictionary of directory listings, updated in place.
+    """
+
+    parent = path.parent
+    if parent not in directory_entries:
+        try:
+            with os.scandir(parent) as entries:
+                directory_entries[parent] = frozenset(entry.name for entry in entries)
+        except OSError:
+            directory_entries[parent] = frozenset()
+
+    return path.name in directory_entries[parent]
+
+
+class _ScriptCheck(NamedTuple):
+    """The outcome of checking a script file."""
+
+    error: str | None
+    """A formatted error message if the script metadata is not valid."""
+    io_files: dict[str, list[tuple[Path, bool]]]
+    """The named input and output file paths, with flags showing if each path exists."""
+
+
+def _check_script_file(
+    file_path: Path,
+    check_file_locations: bool,
+    directory_entries: dict[Path, frozenset[str]],
+) -> _ScriptCheck:
+    """Check the metadata and named input and output files of a script file.
+
+    This validates the script metadata and then, if requested, checks for the named
+    input and output files. The outcome is returned for logging by the caller rather
+    than logged directly, so that the checks can be run in worker processes and then
+    reported in order. Errors are returned as a formatted message rather than raised,
+    because marshmallow validation errors do not reliably pickle.
+
+    Args:
+        file_path: The path to the file to be checked
+        check_file_locations: Should the input and output file locations be checked.
+        directory_entries: A dictionary of cached directory listings, see
+            :func:`_path_exists`.
+    """
+
+    try:
+        metadata = validate_script_metadata(file_path=file_path)
+    except ValidationError as excep:
+        return _ScriptCheck(
+            error=indent(pformat(excep.messages, indent=1, compact=True), "     "),
+            io_files={},
+        )
+    except (ValueError, YAMLError) as excep:
+        return _ScriptCheck(error="     " + str(excep), io_files={})
+
+    io_files: dict[str, list[tuple[Path, bool]]] = {}
+    if check_file_locations:
+        for io_type, file_details in (
+            ("inputs", metadata.input_files),
+            ("outputs", metadata.output_files),
+        ):
+            paths = [Path(details.path) / details.name for details in file_details]
+            io_files[io_type] = [
+                (path, _path_exists(path, directory_entries)) for path in paths
+            ]
+
+    return _ScriptCheck(error=None, io_files=io_files)
+
+
 def check_scripts(
     config: Config,
     directory: Path | None = None,
     check_file_locations: bool = True,
-    ignore_files: list[str] = ["__init__.py", "README.md"],
+    ignore_files: Iterable[str] | None = None,
 ) -> bool:
     """Recursively validate metadata in script directories.
 
@@ -255,9 +378,14 @@ def check_scripts(
         check_file_locations: A boolean flag that sets if the function validates the
             locations of named input and output files from script metadata.
         ignore_files: A set of filenames that match the various supported formats but
-            that should not be validated.
+            that should not be validated. Defaults to ``__init__.py`` and
+            ``README.md`` files.
     """
 
+    ignore_files = (
+        _DEFAULT_IGNORE_FILES if ignore_files is None else frozenset(ignore_files)
+    )
+
     # Default is to search the analysis directory
     if directory is None:
         directory = Path(config.repository_path) / "analysis"
@@ -274,61 +402,55 @@ def check_scripts(
         return False
 
     # Get the script files in the directory and subdirectories
-    script_files = {
-        f
-        for f in directory.rglob("*")
-        if not f.name.startswith(".")
-        and f.is_file()
-        and f.suffix.lower() in SCRIPT_FILES
-        and f.name not in ignore_files
-    }
+    script_files = set(_iter_script_files(directory.absolute(), ignore_files))
 
     LOGGER.info(f" - Found {len(script_files)} script files")
 
-    # Check each of the script files, recording if the process has logged errors
+    # Check the script files, using worker processes for large numbers of files
+    sorted_script_files = sorted(script_files)
+    check_file = partial(
+        _check_script_file,
+        check_file_locations=check_file_locations,
+        directory_entries={},
+    )
+    if len(sorted_script_files) >= _PARALLEL_VALIDATION_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(check_file, sorted_script_files, chunksize=8))
+    else:
+        results = list(map(check_file, sorted_script_files))
+
+    # The script files are absolute paths, so can be made relative to the repository
+    # root without resolving them again
+    relative_path = relative_path_function(config)
+
+    # Report the check results for each of the script files, recording if the process
+    # has logged errors
     return_value = True
 
-    for file in sorted(script_files):
+    for file, result in zip(sorted_script_files, results):
         # Get a prettier path for the file relative to the repo root.
-        rel_path = file.absolute().relative_to(config.repository_path)
+        file_relative = relative_path(file)
+        rel_path = file if file_relative is None else file_relative
 
-        # Validate the script metadata
-        try:
-            yaml_contents = validate_script_metadata(file_path=file)
-        except (ValueError, YAMLError, ValidationError) as excep:
+        # Report validation failures
+        if result.error is not None:
             LOGGER.error(f"   \u2717 {rel_path}")
-            if isinstance(excep, ValidationError):
-                LOGGER.error(
-                    indent(pformat(excep.messages, indent=1, compact=True), "     ")
-                )
-            else:
-                LOGGER.error("     " + str(excep))
+            LOGGER.error(result.error)
             return_value = False
             continue
 
         LOGGER.info(f"   \u2713 {rel_path}")
 
-        if check_file_locations:
-            # Validate any named input and output paths
-
-            io_files = {
-                "inputs": [
-                    Path(file.path) / file.name for file in yaml_contents.input_files
-                ],
-                "outputs": [
-                    Path(file.path) / file.name for file in yaml_contents.output_files
-                ],
-            }
-
-            for io_type, files in io_files.items():
-                LOGGER.info(f"     Checking {io_type} files")
-                for file in files:
-                    if not file.exists():
-                        LOGGER.error(f"       \u2717 File not found: {file!s}")
-                        return_value = False
-                    else:
-                        LOGGER.info(f"       \u2713 File found: {file!s}")
-
-            # TODO - other validation? required packages in requirement/pyproject.toml
+        # Report any named input and output paths
+        for io_type, io_paths in result.io_files.items():
+            LOGGER.info(f"     Checking {io_type} files")
+            for io_path, exists in io_paths:
+                if exists:
+                    LOGGER.info(f"       \u2713 File found: {io_path!s}")
+                else:
+                    LOGGER.error(f"       \u2717 File not found: {io_path!s}")
+                    return_value = False
+
+        # TODO - other validation? required packages in requirement/pyproject.toml
 
     return return_value
@@ -0,0 +1,44 @@
+"""Shared utilities for the maintenance tool."""
+
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+from ve_data_science_tool.config import Config
+
+
+def relative_path_function(config: Config) -> Callable[[str | Path], Path | None]:
+    """Create a function to get paths relative to the repository root.
+
+    The returned function takes an absolute, normalised path and returns the path
+    relative to the repository root, or None if the path is not within the repository.
+    The repository root itself gives ``Path(".")``. Paths that might be
+    relative or contain symbolic links should be resolved before they are passed to the
+    function.
+
+    This is a fast alternative to ``Path.relative_to`` for large numbers of paths: the
+    repository root is converted once to a prefix string ending in a path separator and
+    each path is then checked for and sliced to remove that prefix. The prefix check
+    uses normcase to match the case insensitivity of ``relative_to`` on Windows, which
+    does not change the string length, so the original path can be sliced to keep its
+    case.
+
+    Args:
+        config: A Config object.
+    """
+
+    root_prefix = os.path.normcase(
+        os.path.join(os.path.abspath(config.repository_path), "")
+    )
+
+    def _relative_path(path: str | Path) -> Path | None:
+        path_str = os.fspath(path)
+        path_case = os.path.normcase(path_str)
+
+        if path_case.startswith(root_prefix):
+            return Path(path_str[len(root_prefix) :])
+        if os.path.join(path_case, "") == root_prefix:
+            return Path(".")
+        return None
+
+    return _relative_path